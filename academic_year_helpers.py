@@ -5,6 +5,7 @@ Auto-sync academic years from programs to students/faculty
 
 from models import db, Student, Faculty, Program, SystemSettings
 from datetime import datetime
+from functools import lru_cache
 
 def sync_student_academic_years():
     """
@@ -72,6 +73,23 @@ def get_current_academic_year(program_id=None):
     current_year = datetime.now().year
     return f"{current_year}-{current_year + 1}"
 
+@lru_cache(maxsize=1)
+def _enrollment_academic_year(year, month):
+    if month >= 6:
+        return f"{year}-{str(year + 1)[-2:]}"
+    return f"{year - 1}-{str(year)[-2:]}"
+
+def enrollment_academic_year():
+    """
+    Academic year stamped on new subject enrollments
+    The year starts in June; memoized per calendar month
+    
+    Returns:
+        str: Academic year in format "YYYY-YY"
+    """
+    now = datetime.now()
+    return _enrollment_academic_year(now.year, now.month)
+
 def update_program_academic_year(program_id, academic_year):
     """
     Update program's academic year and sync to all students/faculty
@@ -90,23 +108,17 @@ def update_program_academic_year(program_id, academic_year):
     # Update program
     program.current_academic_year = academic_year
     
-    # Update all students in this program
-    students = Student.query.filter_by(
+    # Update all students in this program (one UPDATE statement)
+    students_updated = Student.query.filter_by(
         program_id=program_id,
         is_deleted=False
-    ).all()
-    
-    for student in students:
-        student.current_academic_year = academic_year
+    ).update({'current_academic_year': academic_year}, synchronize_session=False)
     
-    # Update all faculty in this program
-    faculties = Faculty.query.filter_by(
+    # Update all faculty in this program (one UPDATE statement)
+    faculty_updated = Faculty.query.filter_by(
         program_id=program_id,
         is_deleted=False
-    ).all()
-    
-    for faculty in faculties:
-        faculty.current_academic_year = academic_year
+    ).update({'current_academic_year': academic_year}, synchronize_session=False)
     
     db.session.commit()
     
@@ -114,6 +126,6 @@ def update_program_academic_year(program_id, academic_year):
         'success': True,
         'program': program.program_name,
         'academic_year': academic_year,
-        'students_updated': len(students),
-        'faculty_updated': len(faculties)
+        'students_updated': students_updated,
+        'faculty_updated': faculty_updated
     }
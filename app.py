@@ -10,22 +10,48 @@ Project Structure:
 - routes/: Modular route blueprints (for students to work on)
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, send_file
+from flask import Flask, render_template, stream_template, get_flashed_messages, request, jsonify, redirect, url_for, flash, session, send_file, make_response
 from datetime import datetime, date, time, timedelta
 import os
 import math
+import tempfile
 import json
+import hashlib
+import random
+import secrets
+import traceback
 import uuid
-from io import BytesIO
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy import desc
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, contains_eager, raiseload, load_only
+from work_diary_helpers import (
+    schedule_duration_hours,
+    build_months_structure_from_rows,
+    filter_and_assign_sl,
+    COMBINED_HEADER
+)
+from timezone_utils import format_ist_time
+from academic_year_helpers import enrollment_academic_year
+from cache_helpers import work_diary_cache, dashboard_counts_cache, fee_access_cache, get_or_compute, invalidate
 from fee_helpers import (
     assign_fee_to_student,
     add_additional_fee,
     remove_additional_fee,
-    get_student_fee_breakdown
+    get_student_fee_breakdown,
+    additional_fees_total,
+    parse_additional_fees,
+    bulk_assign_fees
 )
 from docx import Document
 from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from xml.sax.saxutils import escape as xml_escape
 
 # Import configuration
 from config import Config
@@ -33,12 +59,21 @@ from config import Config
 # Import database instance from models
 from models import db
 
+# orjson-backed JSON provider for jsonify() and request.get_json()
+from json_helpers import ORJSONProvider
+
 # Initialize Flask application
 app = Flask(__name__)
 
 # Load configuration
 app.config.from_object(Config)
 
+# Serialize JSON with orjson
+app.json = ORJSONProvider(app)
+
+# Keep compiled templates on disk so new worker processes skip reparsing them
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
 # Configure session for PWA persistence (for localhost/development)
 app.config['SESSION_COOKIE_NAME'] = 'bca_bub_session'
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'  # Use Lax for local development
@@ -63,9 +98,9 @@ from models import (
     Semester, Subject, SubjectAllocation, ClassSchedule,
     AttendanceSession, AttendanceRecord, Test, TestResult,
     WorkDiary, ImportLog, Unit, Chapter, Concept,
-    CampusCheckIn, CollegeConfig, StudentSubjectEnrollment,
-    FacultyAttendance, FeeStructure, FeeReceipt, Holiday, SystemSettings,
-    ProgramCoordinator
+    CampusCheckIn, CollegeConfig, StudentSubjectEnrollment, StudentEnrollment,
+    FacultyAttendance, FeeTemplate, FeeStructure, FeeReceipt, Holiday, SystemSettings,
+    ProgramCoordinator, session_attendance_counts, work_diary_rows
 )
 
 # Import authentication utilities
@@ -124,6 +159,20 @@ def section_display_filter(section, subject=None):
     return "BCA-Subject"
 
 
+def soft_delete(model, **filters):
+    """
+    Mark the row matching filters as deleted with a single UPDATE, no SELECT.
+    Deleting an already deleted row still succeeds.
+    
+    Returns:
+        bool: False if no row matched
+    """
+    updated = model.query.filter_by(**filters).update(
+        {'is_deleted': True}, synchronize_session=False
+    )
+    return updated > 0
+
+
 def get_or_create_virtual_section(subject):
     """
     Get or create a virtual section for a subject that doesn't carry sections.
@@ -168,6 +217,40 @@ def get_or_create_virtual_section(subject):
 
 
 
+# Dashboard endpoint for each role (role_key -> endpoint name)
+ROLE_DASHBOARD_ENDPOINTS = {
+    'admin': 'admin_dashboard',
+    'faculty': 'faculty_dashboard_view',
+    'student': 'student_dashboard',
+}
+
+
+def dashboard_url_for(user, honor_parent_login=True, fallback='index'):
+    """
+    Return the dashboard URL for a user based on their role.
+    
+    Args:
+        user: User object
+        honor_parent_login: Route parent logins: students who logged in as
+            parent go to the parent dashboard, and legacy parent accounts
+            to the student dashboard
+        fallback: Endpoint used when the role has no dashboard
+        
+    Returns:
+        str: URL to redirect to
+    """
+    role_key = user.role.role_key if user.role else ''
+    
+    if honor_parent_login:
+        if role_key == 'student' and session.get('login_as_parent'):
+            return url_for('parent_dashboard')
+        # Legacy: parent users with separate accounts also use the student dashboard
+        if role_key == 'parent':
+            return url_for('student_dashboard')
+    
+    return url_for(ROLE_DASHBOARD_ENDPOINTS.get(role_key, fallback))
+
+
 # ============================================
 # Routes
 # ============================================
@@ -191,7 +274,7 @@ def login():
 
     if current_user:
         # Check if user is admin
-        if current_user.role and current_user.role.role_name.lower() == 'admin':
+        if current_user.role and current_user.role.role_key == 'admin':
             return redirect(url_for('admin_dashboard'))
         return redirect(url_for('index'))
     
@@ -209,7 +292,7 @@ def login():
             
             # Store login_type in session for parent view mode
             # This allows same credentials to access as student or as parent
-            if login_type == 'parent' and user.role and user.role.role_name.lower() == 'student':
+            if login_type == 'parent' and user.role and user.role.role_key == 'student':
                 session['login_as_parent'] = True
             else:
                 session['login_as_parent'] = False
@@ -221,25 +304,7 @@ def login():
             if next_page and next_page.startswith('/'):
                 return redirect(next_page)
             
-            # Admin users go to admin dashboard
-            if user.role and user.role.role_name.lower() == 'admin':
-                return redirect(url_for('admin_dashboard'))
-            
-            # Student users go to student dashboard (whether logged in as student or parent)
-            if user.role and user.role.role_name.lower() == 'student':
-                if session.get('login_as_parent'):
-                    return redirect(url_for('parent_dashboard'))
-                return redirect(url_for('student_dashboard'))
-            
-            # Legacy: Parent users with separate accounts also go to student dashboard
-            if user.role and user.role.role_name.lower() == 'parent':
-                return redirect(url_for('student_dashboard'))
-                
-            # Faculty users go to faculty dashboard
-            if user.role and user.role.role_name.lower() == 'faculty':
-                return redirect(url_for('faculty_dashboard_view'))
-            
-            return redirect(url_for('index'))
+            return redirect(dashboard_url_for(user))
         else:
             return render_template('login.html', error='Invalid username or password')
     
@@ -269,18 +334,9 @@ def index():
     if not current_user:
         return redirect(url_for('login'))
         
-    # Redirect based on role
-    role_name = current_user.role.role_name.lower() if current_user.role else ''
-    
-    if role_name == 'admin':
-        return redirect(url_for('admin_dashboard'))
-    elif role_name == 'faculty':
-        return redirect(url_for('faculty_dashboard_view'))
-    elif role_name == 'student':
-        return redirect(url_for('student_dashboard'))
-    else:
-        # Fallback
-        return redirect(url_for('login'))
+    # Redirect based on role. Unlike login(), this ignores parent logins and
+    # sends legacy parent accounts and unknown roles back to login.
+    return redirect(dashboard_url_for(current_user, honor_parent_login=False, fallback='login'))
 
 
 @app.route('/manifest.json')
@@ -365,7 +421,9 @@ def admin_attendance_overview():
     TODO for students: Implement full attendance taking workflow
     """
     # Get recent attendance sessions
-    sessions = AttendanceSession.query.order_by(AttendanceSession.taken_at.desc()).limit(10).all()
+    sessions = AttendanceSession.query.options(
+        joinedload(AttendanceSession.schedule).joinedload(ClassSchedule.subject)
+    ).order_by(AttendanceSession.taken_at.desc()).limit(10).all()
     return render_template('attendance.html', sessions=sessions)
 
 
@@ -392,13 +450,14 @@ def api_faculty():
             )
             db.session.add(new_faculty)
             db.session.commit()
+            invalidate(dashboard_counts_cache)
             return jsonify({'success': True, 'faculty': new_faculty.to_dict()}), 201
         except Exception as e:
             db.session.rollback()
             return jsonify({'success': False, 'error': str(e)}), 400
     
-    # GET request
-    faculties = Faculty.query.filter_by(is_deleted=False).all()
+    # GET request - program is eager-loaded because to_dict() reads it per row
+    faculties = Faculty.query.options(joinedload(Faculty.program)).filter_by(is_deleted=False).all()
     return jsonify([f.to_dict() for f in faculties])
 
 
@@ -422,13 +481,17 @@ def api_students():
             )
             db.session.add(new_student)
             db.session.commit()
+            invalidate(dashboard_counts_cache)
             return jsonify({'success': True, 'student': new_student.to_dict()}), 201
         except Exception as e:
             db.session.rollback()
             return jsonify({'success': False, 'error': str(e)}), 400
     
-    # GET request
-    students = Student.query.filter_by(is_deleted=False).limit(100).all()
+    # GET request - program/section are eager-loaded because to_dict() reads them per row
+    students = Student.query.options(
+        joinedload(Student.program),
+        joinedload(Student.section)
+    ).filter_by(is_deleted=False).limit(100).all()
     return jsonify([s.to_dict() for s in students])
 
 
@@ -439,8 +502,6 @@ def update_student_profile():
     Update student profile information.
     When date_of_birth is updated, automatically update password to match DOB in DDMMYYYY format.
     """
-    from werkzeug.security import generate_password_hash
-    from datetime import datetime
     
     current_user_obj = get_current_user()
     
@@ -470,7 +531,7 @@ def update_student_profile():
                 
                 # Update password to match new DOB in DDMMYYYY format (without dashes)
                 password_str = new_dob.strftime('%d%m%Y')
-                current_user_obj.password_hash = generate_password_hash(password_str)
+                current_user_obj.password_hash = hash_password(password_str)
                 
             except ValueError:
                 return jsonify({'success': False, 'error': 'Invalid date format'}), 400
@@ -502,18 +563,24 @@ def api_create_attendance_session():
     try:
         current_user = get_current_user()
         
-        # Create attendance session
-        session = AttendanceSession(
-            schedule_id=data.get('schedule_id'),
-            taken_by_user_id=current_user.user_id,
-            status='draft'
-        )
-        db.session.add(session)
-        db.session.flush()  # Get session ID without committing
-        
-        # Auto-generate work diary entry if schedule exists
-        if session.schedule:
-            auto_create_work_diary_from_attendance(session)
+        # Load the schedule up front so it is not lazy-loaded mid-transaction
+        schedule_id = data.get('schedule_id')
+        schedule = ClassSchedule.query.get(schedule_id) if schedule_id else None
+        if not schedule:
+            return jsonify({'success': False, 'error': 'Schedule not found'}), 404
+        
+        # Session and diary entry are written in one savepoint
+        with db.session.begin_nested():
+            session = AttendanceSession(
+                schedule_id=schedule.schedule_id,
+                taken_by_user_id=current_user.user_id,
+                status='draft'
+            )
+            db.session.add(session)
+            db.session.flush()  # Get session ID without committing
+            
+            # Auto-generate work diary entry from the preloaded schedule
+            auto_create_work_diary_from_attendance(session, schedule)
         
         db.session.commit()
         return jsonify({'success': True, 'session': session.to_dict()}), 201
@@ -546,7 +613,10 @@ def get_subject_sections(subject_id):
         
         # Get core sections (regular departmental sections)
         if subject.program_id and subject.semester_id:
-            core_sections_query = Section.query.filter_by(
+            core_sections_query = Section.query.options(
+                joinedload(Section.program),
+                joinedload(Section.class_teacher)
+            ).filter_by(
                 program_id=subject.program_id,
                 current_semester=subject.semester_id,
                 is_elective=False,
@@ -555,7 +625,10 @@ def get_subject_sections(subject_id):
             core_sections = [s.to_dict() for s in core_sections_query]
         
         # Get virtual sections (for electives/specializations without sections)
-        virtual_sections_query = Section.query.filter_by(
+        virtual_sections_query = Section.query.options(
+            joinedload(Section.program),
+            joinedload(Section.class_teacher)
+        ).filter_by(
             linked_subject_id=subject_id,
             is_elective=True,
             is_deleted=False
@@ -586,7 +659,6 @@ def get_setting(setting_key):
     Get a system setting value by key.
     Used to check if features like past attendance are enabled.
     """
-    from models import SystemSettings
     
     setting = SystemSettings.query.filter_by(setting_key=setting_key).first()
     
@@ -620,8 +692,6 @@ def update_setting():
     """
     Update a system setting.
     """
-    from models import SystemSettings
-    from datetime import datetime
     from flask_login import current_user
     
     data = request.get_json()
@@ -672,35 +742,121 @@ def update_setting():
 # Work Diary Routes
 # ============================================
 
-@app.route('/faculty/work-diary')
-@faculty_required
-def faculty_work_diary():
+def build_work_diary_entries(query):
     """
-    Display work diary entries based on actual attendance taken.
-    Shows classes conducted date-wise and faculty-wise.
+    Build the work diary rows shown on the faculty work diary page.
+    
+    Args:
+        query: AttendanceSession query (joined to ClassSchedule) already
+            filtered to the sessions the user may see
+        
+    Returns:
+        list: Diary entry dicts for the 100 most recent sessions
     """
-    current_user = get_current_user()
+    # Schedule, subject, section and faculty are read for every row, so load them up front
+    query = query.options(
+        contains_eager(AttendanceSession.schedule).joinedload(ClassSchedule.subject),
+        contains_eager(AttendanceSession.schedule).joinedload(ClassSchedule.section),
+        joinedload(AttendanceSession.taken_by).joinedload(User.faculty)
+    )
     
-    # Always fetch faculty record for navigation purposes
-    faculty_record = Faculty.query.filter_by(user_id=current_user.user_id).first()
-    if not faculty_record:
-        diaries = []
-        return render_template('work_diary.html', diaries=diaries, faculty=None, is_class_teacher=False)
+    # Get recent sessions with their precomputed attendance counts
+    counts = session_attendance_counts.c
+    rows = query.outerjoin(
+        session_attendance_counts,
+        counts.attendance_session_id == AttendanceSession.attendance_session_id
+    ).add_columns(
+        counts.present_count,
+        counts.total_count,
+        counts.enrolled_present,
+        counts.enrolled_total
+    ).order_by(AttendanceSession.taken_at.desc()).limit(100).all()
+    sessions = [row[0] for row in rows]
+    
+    # Subjects requiring enrollment (specialization/elective) only count enrolled students
+    enrollment_sessions = {
+        s.attendance_session_id: s.schedule.subject_id
+        for s in sessions
+        if s.schedule.subject and s.schedule.subject.subject_category in ['specialization', 'elective']
+    }
     
-    # Base query for AttendanceSession
-    query = AttendanceSession.query.join(ClassSchedule).filter(
-        AttendanceSession.is_deleted == False
-    )
+    present_by_session = defaultdict(int)
+    total_by_session = defaultdict(int)
+    pending_session_ids = []
+    for session, present, total, enrolled_present, enrolled_total in rows:
+        session_id = session.attendance_session_id
+        if total is None:
+            # Not in the counts view yet (taken since its last refresh)
+            pending_session_ids.append(session_id)
+        elif session_id in enrollment_sessions:
+            present_by_session[session_id] = enrolled_present
+            total_by_session[session_id] = enrolled_total
+        else:
+            present_by_session[session_id] = present
+            total_by_session[session_id] = total
     
-    if not can_view_all_diaries():
-        # Faculty view: only their own sessions
-        query = query.filter(AttendanceSession.taken_by_user_id == current_user.user_id)
+    # Count pending regular sessions live in one grouped query
+    regular_session_ids = [
+        session_id for session_id in pending_session_ids
+        if session_id not in enrollment_sessions
+    ]
+    if regular_session_ids:
+        status_counts = db.session.query(
+            AttendanceRecord.attendance_session_id,
+            AttendanceRecord.status,
+            db.func.count()
+        ).filter(
+            AttendanceRecord.attendance_session_id.in_(regular_session_ids),
+            AttendanceRecord.is_deleted == False
+        ).group_by(
+            AttendanceRecord.attendance_session_id,
+            AttendanceRecord.status
+        ).all()
+        
+        for session_id, status, count in status_counts:
+            total_by_session[session_id] += count
+            if status == 'present':
+                present_by_session[session_id] += count
     
-    # Get recent sessions
-    sessions = query.order_by(AttendanceSession.taken_at.desc()).limit(100).all()
+    # Pending enrollment-based sessions: count only enrolled students, with the
+    # enrollment check done in SQL so no student ID lists are sent over
+    pending_enrollment_sessions = [
+        session_id for session_id in pending_session_ids
+        if session_id in enrollment_sessions
+    ]
+    if pending_enrollment_sessions:
+        is_enrolled = db.session.query(StudentSubjectEnrollment.enrollment_id).filter(
+            StudentSubjectEnrollment.student_id == AttendanceRecord.student_id,
+            StudentSubjectEnrollment.subject_id == ClassSchedule.subject_id,
+            StudentSubjectEnrollment.is_deleted == False
+        ).exists()
+        status_counts = db.session.query(
+            AttendanceRecord.attendance_session_id,
+            AttendanceRecord.status,
+            db.func.count()
+        ).join(
+            AttendanceSession,
+            AttendanceSession.attendance_session_id == AttendanceRecord.attendance_session_id
+        ).join(
+            ClassSchedule,
+            ClassSchedule.schedule_id == AttendanceSession.schedule_id
+        ).filter(
+            AttendanceRecord.attendance_session_id.in_(pending_enrollment_sessions),
+            AttendanceRecord.is_deleted == False,
+            is_enrolled
+        ).group_by(
+            AttendanceRecord.attendance_session_id,
+            AttendanceRecord.status
+        ).all()
+        
+        for session_id, status, count in status_counts:
+            total_by_session[session_id] += count
+            if status == 'present':
+                present_by_session[session_id] += count
     
     # Process sessions into displayable diary entries
     diaries = []
+    duration_by_schedule = {}
     for idx, session in enumerate(sessions):
         # Fetch related data
         schedule = session.schedule
@@ -708,14 +864,11 @@ def faculty_work_diary():
         section = schedule.section
         faculty = session.taken_by.faculty
         
-        # Calculate hours
-        actual_hours = 0
-        if schedule.start_time and schedule.end_time:
-            # Simple duration calculation
-            dummy_date = date.today()
-            start_dt = datetime.combine(dummy_date, schedule.start_time)
-            end_dt = datetime.combine(dummy_date, schedule.end_time)
-            actual_hours = (end_dt - start_dt).total_seconds() / 3600
+        # Calculate hours (once per schedule)
+        actual_hours = duration_by_schedule.get(schedule.schedule_id)
+        if actual_hours is None:
+            actual_hours = schedule_duration_hours(schedule.start_time, schedule.end_time)
+            duration_by_schedule[schedule.schedule_id] = actual_hours
         
         # Logic for claiming hours: Lab period reduced by 3/4 (which means 0.75 of actual)
         is_lab = subject.subject_type and subject.subject_type.lower() in ['lab', 'practical']
@@ -725,37 +878,9 @@ def faculty_work_diary():
         particulars = session.topic_taught or "Regular Class"
         sem_info = f"({section.current_semester if section else '?'} Sem)"
         
-        # Count students present and total
-        # For subjects requiring enrollment (specialization/elective), only count enrolled students
-        if subject and subject.subject_category in ['specialization', 'elective']:
-            # Get enrolled student IDs for this subject
-            enrolled_student_ids = db.session.query(StudentSubjectEnrollment.student_id).filter_by(
-                subject_id=subject.subject_id,
-                is_deleted=False
-            ).all()
-            enrolled_ids = [e[0] for e in enrolled_student_ids]
-            
-            # Count only enrolled students
-            present_count = AttendanceRecord.query.filter(
-                AttendanceRecord.attendance_session_id == session.attendance_session_id,
-                AttendanceRecord.status == 'present',
-                AttendanceRecord.student_id.in_(enrolled_ids)
-            ).count()
-            
-            total_count = AttendanceRecord.query.filter(
-                AttendanceRecord.attendance_session_id == session.attendance_session_id,
-                AttendanceRecord.student_id.in_(enrolled_ids)
-            ).count()
-        else:
-            # For regular subjects (compulsory/language), count all students in the section
-            present_count = AttendanceRecord.query.filter_by(
-                attendance_session_id=session.attendance_session_id,
-                status='present'
-            ).count()
-            
-            total_count = AttendanceRecord.query.filter_by(
-                attendance_session_id=session.attendance_session_id
-            ).count()
+        # Count students present and total (precomputed above)
+        present_count = present_by_session[session.attendance_session_id]
+        total_count = total_by_session[session.attendance_session_id]
 
         diaries.append({
             'sl_no': idx + 1,
@@ -774,10 +899,49 @@ def faculty_work_diary():
             'present_count': present_count,
             'total_count': total_count
         })
-        
-    # Check if Class Teacher
-    managed_section = Section.query.filter_by(class_teacher_id=faculty_record.faculty_id).first()
-    is_class_teacher = managed_section is not None
+    
+    return diaries
+
+
+@app.route('/faculty/work-diary')
+@faculty_required
+def faculty_work_diary():
+    """
+    Display work diary entries based on actual attendance taken.
+    Shows classes conducted date-wise and faculty-wise.
+    """
+    current_user = get_current_user()
+    
+    # Always fetch faculty record for navigation purposes, together with
+    # whether they are a class teacher, in one round-trip
+    manages_section = db.session.query(Section.section_id).filter(
+        Section.class_teacher_id == Faculty.faculty_id
+    ).exists()
+    faculty_row = db.session.query(Faculty, manages_section).filter(
+        Faculty.user_id == current_user.user_id
+    ).first()
+    if not faculty_row:
+        diaries = []
+        return render_template('work_diary.html', diaries=diaries, faculty=None, is_class_teacher=False)
+    faculty_record, is_class_teacher = faculty_row
+    
+    # Base query for AttendanceSession
+    query = AttendanceSession.query.join(ClassSchedule).filter(
+        AttendanceSession.is_deleted == False
+    )
+    
+    if not can_view_all_diaries():
+        # Faculty view: only their own sessions
+        query = query.filter(AttendanceSession.taken_by_user_id == current_user.user_id)
+    
+    # Reuse the entries built for this user in the last minute unless a newer
+    # session exists; writes to attendance records also clear the cache
+    latest_taken_at = query.with_entities(db.func.max(AttendanceSession.taken_at)).scalar()
+    diaries = get_or_compute(
+        work_diary_cache,
+        (current_user.user_id, latest_taken_at),
+        lambda: build_work_diary_entries(query)
+    )
         
     return render_template('work_diary.html', 
                          diaries=diaries, 
@@ -785,6 +949,57 @@ def faculty_work_diary():
                          faculty=faculty_record)
 
 
+# Work diary table cells are written as raw OOXML: setting fonts and alignment
+# through python-docx objects cell by cell is slow for long date ranges
+DOCX_FONT_RUN_PROPS = '<w:rFonts w:ascii="Times New Roman" w:hAnsi="Times New Roman"/>{bold}<w:sz w:val="{half_points}"/>'
+DOCX_CELL_RUN_PROPS = {
+    bold: DOCX_FONT_RUN_PROPS.format(bold='<w:b/>' if bold else '', half_points=18)  # 9pt
+    for bold in (False, True)
+}
+# Week headings (bold 11pt), copied onto each heading run
+DOCX_WEEK_LABEL_RPR = parse_xml(
+    f'<w:rPr {nsdecls("w")}>{DOCX_FONT_RUN_PROPS.format(bold="<w:b/>", half_points=22)}</w:rPr>'
+)
+DOCX_CELL_TEMPLATE = (
+    '<w:tc><w:tcPr><w:tcW w:w="{width}" w:type="dxa"/></w:tcPr>'
+    '<w:p><w:pPr><w:spacing w:before="{spacing}" w:after="{spacing}"/>{align}</w:pPr>{run}</w:p></w:tc>'
+)
+DOCX_CENTER_ALIGN = '<w:jc w:val="center"/>'
+
+
+def docx_table_row(values, col_widths_pt, bold=False, centered=(), spacing_pt=1):
+    """
+    Build a <w:tr> element for a work diary table (Times New Roman 9pt).
+    
+    Args:
+        values: Cell texts; None leaves the cell empty
+        col_widths_pt: Column widths in points
+        bold: Whether the cell text is bold
+        centered: Column indexes to center
+        spacing_pt: Paragraph spacing before and after the cell text, in points
+        
+    Returns:
+        CT_Row element ready to append to a table's _tbl
+    """
+    run_props = DOCX_CELL_RUN_PROPS[bold]
+    cells = []
+    for idx, (value, width) in enumerate(zip(values, col_widths_pt)):
+        run = ''
+        if value is not None:
+            lines = '<w:br/>'.join(
+                f'<w:t xml:space="preserve">{xml_escape(line)}</w:t>'
+                for line in str(value).split('\n')
+            )
+            run = f'<w:r><w:rPr>{run_props}</w:rPr>{lines}</w:r>'
+        cells.append(DOCX_CELL_TEMPLATE.format(
+            width=int(width * 20),  # points -> twentieths of a point
+            spacing=int(spacing_pt * 20),
+            align=DOCX_CENTER_ALIGN if idx in centered else '',
+            run=run
+        ))
+    return parse_xml(f'<w:tr {nsdecls("w")}>{"".join(cells)}</w:tr>')
+
+
 @app.route('/faculty/work-diary/docx')
 @faculty_required
 def generate_work_diary_docx():
@@ -792,13 +1007,9 @@ def generate_work_diary_docx():
     Generate DOCX report for work diary (?start_date=...&end_date=...&faculty=...).
     Uses date range filtering instead of month-based filtering.
     """
-    from work_diary_helpers import (
-        build_months_structure_from_sessions,
-        filter_and_assign_sl,
-        COMBINED_HEADER
-    )
-    
-    current_user = get_current_user()
+    # Load the user with their faculty record in one round-trip; the
+    # can_view_all_diaries() check below reads user.faculty as well
+    current_user = User.query.options(joinedload(User.faculty)).get(session['user_id'])
     start_date_str = request.args.get("start_date")
     end_date_str = request.args.get("end_date")
     faculty_param = request.args.get("faculty", "current")
@@ -807,8 +1018,8 @@ def generate_work_diary_docx():
         return "Missing start_date or end_date parameter (format: 'YYYY-MM-DD')", 400
     
     try:
-        start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-        end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+        start_date = date.fromisoformat(start_date_str)
+        end_date = date.fromisoformat(end_date_str)
     except ValueError:
         return "Invalid date format. Use YYYY-MM-DD", 400
     
@@ -816,71 +1027,56 @@ def generate_work_diary_docx():
         return "Start date must be before or equal to end date", 400
     
     # Get faculty record
-    faculty_record = Faculty.query.filter_by(user_id=current_user.user_id).first()
+    faculty_record = current_user.faculty
     if not faculty_record:
         return "Faculty record not found", 404
     
     # Determine which faculty's diary to generate
     # Use ClassSchedule.date (class conducted date) as the primary filter
     # This is important because it represents when the class was actually conducted,
-    # not when the attendance was submitted (which may differ for past attendance)
+    # not when the attendance was submitted (which may differ for past attendance).
+    # Sessions without a schedule fall back to the taken_at date.
+    # Rows come flat from the v_work_diary_rows view (live sessions only).
+    diary_rows = work_diary_rows.c
+    query = db.session.query(work_diary_rows).filter(
+        db.or_(
+            db.and_(
+                diary_rows.class_date >= start_date,
+                diary_rows.class_date <= end_date
+            ),
+            db.and_(
+                diary_rows.schedule_id == None,
+                db.func.date(diary_rows.taken_at) >= start_date,
+                db.func.date(diary_rows.taken_at) <= end_date
+            )
+        )
+    )
+    
     if faculty_param == "current" or not can_view_all_diaries():
         # Current faculty only
         selected_faculty = f"{faculty_record.first_name} {faculty_record.last_name}"
-        
-        # Query sessions that have a schedule with a date
-        query_with_schedule = AttendanceSession.query.join(
-            ClassSchedule,
-            AttendanceSession.schedule_id == ClassSchedule.schedule_id
-        ).filter(
-            AttendanceSession.is_deleted == False,
-            AttendanceSession.taken_by_user_id == current_user.user_id,
-            ClassSchedule.date >= start_date,
-            ClassSchedule.date <= end_date
-        )
-        
-        # Also include sessions without schedules (fallback to taken_at date)
-        query_without_schedule = AttendanceSession.query.filter(
-            AttendanceSession.is_deleted == False,
-            AttendanceSession.taken_by_user_id == current_user.user_id,
-            AttendanceSession.schedule_id == None,
-            db.func.date(AttendanceSession.taken_at) >= start_date,
-            db.func.date(AttendanceSession.taken_at) <= end_date
-        )
-        
-        # Combine both queries
-        sessions = query_with_schedule.union(query_without_schedule).order_by(
-            AttendanceSession.taken_at.desc()
-        ).limit(500).all()
+        query = query.filter(diary_rows.taken_by_user_id == current_user.user_id)
     else:
         # Admin/coordinator can view all or specific faculty
         selected_faculty = faculty_param if faculty_param != "All" else "All"
-        
-        query_with_schedule = AttendanceSession.query.join(
-            ClassSchedule,
-            AttendanceSession.schedule_id == ClassSchedule.schedule_id
-        ).filter(
-            AttendanceSession.is_deleted == False,
-            ClassSchedule.date >= start_date,
-            ClassSchedule.date <= end_date
-        )
-        
-        query_without_schedule = AttendanceSession.query.filter(
-            AttendanceSession.is_deleted == False,
-            AttendanceSession.schedule_id == None,
-            db.func.date(AttendanceSession.taken_at) >= start_date,
-            db.func.date(AttendanceSession.taken_at) <= end_date
-        )
-        
-        sessions = query_with_schedule.union(query_without_schedule).order_by(
-            AttendanceSession.taken_at.desc()
-        ).limit(500).all()
     
-    # Note: sessions variable is now populated, no need for separate query line
+    # Stream rows in batches straight into the months structure
+    # instead of materializing up to 500 sessions at once.
+    # Session id breaks taken_at ties so the 500-row cut is deterministic.
+    rows = query.order_by(
+        diary_rows.taken_at.desc(),
+        diary_rows.attendance_session_id
+    ).limit(500).yield_per(50)
+    months, faculty_list = build_months_structure_from_rows(rows)
+    
+    # A blank template is capped at 10 weeks, so an empty range longer than
+    # that is almost certainly a mis-set range rather than a manual-entry sheet
+    if not months and (end_date - start_date).days > 70:
+        return "No attendance sessions found in the selected date range", 404
     
     # Build months structure (still using month grouping internally)
     # If no sessions found, create empty structure for the date range
-    if not sessions:
+    if not months:
         # Create empty template with the date range
         months = {}
         faculty_list = [selected_faculty]
@@ -929,17 +1125,11 @@ def generate_work_diary_docx():
             if week_number > 10:
                 break
     else:
-        months, faculty_list = build_months_structure_from_sessions(sessions)
-        
-        if not months:
-            # Fallback to empty template
-            all_rendered_weeks = []
-        else:
-            # Process all months in the date range
-            all_rendered_weeks = []
-            for month_label in sorted(months.keys(), key=lambda m: datetime.strptime(m, "%B %Y")):
-                rendered_weeks = filter_and_assign_sl(months, month_label, selected_faculty)
-                all_rendered_weeks.extend(rendered_weeks)
+        # Process all months in the date range
+        all_rendered_weeks = []
+        for month_label in sorted(months.keys(), key=lambda m: datetime.strptime(m, "%B %Y")):
+            rendered_weeks = filter_and_assign_sl(months, month_label, selected_faculty)
+            all_rendered_weeks.extend(rendered_weeks)
     
     # Create DOCX with A4 portrait orientation
     doc = Document()
@@ -1007,13 +1197,11 @@ def generate_work_diary_docx():
     
     for w in all_rendered_weeks:
         week_label = f"Week {w['week_number']}: {w['display_start'].strftime('%d %b %Y')} — {w['display_end'].strftime('%d %b %Y')}"
-        week_para = doc.add_paragraph(week_label)
+        week_para = doc.add_paragraph()
         week_para.space_before = Pt(8)
         week_para.space_after = Pt(4)
-        for run in week_para.runs:
-            run.bold = True
-            run.font.size = Pt(11)
-            run.font.name = 'Times New Roman'
+        week_run = week_para.add_run(week_label)
+        week_run._r.insert(0, deepcopy(DOCX_WEEK_LABEL_RPR))
         
         rows = []
         for e in w["entries"]:
@@ -1035,71 +1223,25 @@ def generate_work_diary_docx():
         if not rows:
             continue
         
-        table = doc.add_table(rows=1 + len(rows) + 1, cols=len(cols))
+        table = doc.add_table(rows=0, cols=len(cols))
         table.style = 'Table Grid'
         table.autofit = False
         table.allow_autofit = False
+        tbl = table._tbl
+        
+        # Header row - bold and centered
+        tbl.append(docx_table_row(cols, col_widths_pt, bold=True, centered=range(len(cols)), spacing_pt=2))
+        
+        # Data rows - numeric columns centered, long content wraps within the cell
+        for row_data in rows:
+            tbl.append(docx_table_row(row_data, col_widths_pt, centered=(0, 1, 4, 5)))
         
-        # Set column widths in points
-        for i, width in enumerate(col_widths_pt):
-            for row in table.rows:
-                row.cells[i].width = Pt(width)
-        
-        # Header row styling - Times New Roman 9pt (smaller for portrait fit)
-        hdr_cells = table.rows[0].cells
-        for i, c in enumerate(cols):
-            p = hdr_cells[i].paragraphs[0]
-            p.clear()
-            run = p.add_run(c)
-            run.bold = True
-            run.font.size = Pt(9)
-            run.font.name = 'Times New Roman'
-            p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            p.space_before = Pt(2)
-            p.space_after = Pt(2)
-        
-        # Data rows - Times New Roman 9pt with text wrapping (compact for portrait)
-        for r_idx, row_data in enumerate(rows, start=1):
-            row_cells = table.rows[r_idx].cells
-            for c_idx, val in enumerate(row_data):
-                p = row_cells[c_idx].paragraphs[0]
-                p.clear()
-                run = p.add_run(str(val))
-                run.font.size = Pt(9)
-                run.font.name = 'Times New Roman'
-                p.space_before = Pt(1)
-                p.space_after = Pt(1)
-                # Center align numeric columns
-                if c_idx in [0, 1, 4, 5]:
-                    p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                # Enable text wrapping for long content
-                row_cells[c_idx].width = Pt(col_widths_pt[c_idx])
-        
-        # Totals row - Times New Roman 9pt bold (compact for portrait)
-        total_row_cells = table.rows[1 + len(rows)].cells
-        for i in range(len(cols)):
-            p = total_row_cells[i].paragraphs[0]
-            p.clear()
-            p.space_before = Pt(2)
-            p.space_after = Pt(2)
-            
-            if i == 0:
-                run = p.add_run("Weekly Total")
-                run.bold = True
-                run.font.size = Pt(9)
-                run.font.name = 'Times New Roman'
-            elif i == 4:
-                run = p.add_run(f"{w['week_total_actual']:.1f}")
-                run.bold = True
-                run.font.size = Pt(9)
-                run.font.name = 'Times New Roman'
-                p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            elif i == 5:
-                run = p.add_run(f"{w['week_total_claiming']:.1f}")
-                run.bold = True
-                run.font.size = Pt(9)
-                run.font.name = 'Times New Roman'
-                p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        # Totals row
+        tbl.append(docx_table_row(
+            ["Weekly Total", None, None, None,
+             f"{w['week_total_actual']:.1f}", f"{w['week_total_claiming']:.1f}", None],
+            col_widths_pt, bold=True, centered=(4, 5), spacing_pt=2
+        ))
     
     # Calculate total claiming hours for all weeks
     total_claiming = sum(w['week_total_claiming'] for w in all_rendered_weeks)
@@ -1165,10 +1307,12 @@ def generate_work_diary_docx():
     chairman_run.font.size = Pt(11)
     chairman_run.font.name = 'Times New Roman'
     
-    # Save to BytesIO buffer
-    bio = BytesIO()
-    doc.save(bio)
-    bio.seek(0)
+    # Save to an anonymous temporary file so the response streams it from disk
+    # instead of holding the whole document in memory. The file is removed by
+    # the OS when the response closes it after sending.
+    docx_file = tempfile.TemporaryFile(suffix='.docx')
+    doc.save(docx_file)
+    docx_file.seek(0)
     
     # Generate filename with faculty name and month/year
     # Format: FacultyName_MonthYear.docx (e.g., "John_Doe_January_2026.docx")
@@ -1176,7 +1320,7 @@ def generate_work_diary_docx():
     faculty_name_clean = selected_faculty.replace(" ", "_")
     filename = f"{faculty_name_clean}_{month_year}.docx"
     
-    return send_file(bio, as_attachment=True, download_name=filename,
+    return send_file(docx_file, as_attachment=True, download_name=filename,
                      mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
 
 
@@ -1364,18 +1508,30 @@ def reject_work_diary(diary_id):
 @admin_required
 def admin_work_diary():
     """Admin view of all faculty work diaries"""
-    from models import AttendanceSession, ClassSchedule, Faculty, Subject, Section, AttendanceRecord
     
     # Get all faculties for filter
     faculties = Faculty.query.order_by(Faculty.first_name).all()
     
-    # Get all attendance sessions with details
+    # Present/absent counts come from the counts view; sessions taken since its
+    # last refresh fall back to a correlated COUNT, so the page is one query
+    def live_count(status):
+        return db.session.query(db.func.count(AttendanceRecord.record_id)).filter(
+            AttendanceRecord.attendance_session_id == AttendanceSession.attendance_session_id,
+            AttendanceRecord.status == status,
+            AttendanceRecord.is_deleted == False
+        ).correlate(AttendanceSession).scalar_subquery()
+    
+    counts = session_attendance_counts.c
+    
+    # Get all attendance sessions with details and attendance counts
     sessions = db.session.query(
         AttendanceSession,
         ClassSchedule,
         Subject,
         Section,
-        Faculty
+        Faculty,
+        db.func.coalesce(counts.present_count, live_count('present')).label('present_count'),
+        db.func.coalesce(counts.absent_count, live_count('absent')).label('absent_count')
     ).join(
         ClassSchedule, AttendanceSession.schedule_id == ClassSchedule.schedule_id
     ).join(
@@ -1384,6 +1540,9 @@ def admin_work_diary():
         Section, ClassSchedule.section_id == Section.section_id
     ).join(
         Faculty, ClassSchedule.faculty_id == Faculty.faculty_id
+    ).outerjoin(
+        session_attendance_counts,
+        counts.attendance_session_id == AttendanceSession.attendance_session_id
     ).filter(
         AttendanceSession.is_deleted == False
     ).order_by(
@@ -1392,12 +1551,7 @@ def admin_work_diary():
     
     # Format diary entries
     diary_entries = []
-    for session, schedule, subject, section, faculty in sessions:
-        # Count present/absent
-        records = AttendanceRecord.query.filter_by(attendance_session_id=session.attendance_session_id).all()
-        present_count = sum(1 for r in records if r.status == 'present')
-        absent_count = sum(1 for r in records if r.status == 'absent')
-        
+    for session, schedule, subject, section, faculty, present_count, absent_count in sessions:
         diary_entries.append({
             'session_id': session.attendance_session_id,
             'diary_number': session.diary_number,
@@ -1426,18 +1580,26 @@ def admin_work_diary():
 @admin_required
 def admin_dashboard():
     """Admin dashboard with statistics"""
-    from models import Unit, Chapter, Concept
     
-    faculty_count = Faculty.query.filter_by(is_deleted=False).count()
-    student_count = Student.query.filter_by(is_deleted=False).count()
-    subject_count = Subject.query.filter_by(is_deleted=False).count()
-    section_count = Section.query.filter_by(is_deleted=False).count()
+    def live_count(model):
+        return db.session.query(db.func.count()).select_from(model).filter(
+            model.is_deleted == False
+        ).scalar_subquery()
+    
+    # All four counts in a single SELECT (one round-trip), reused for a few
+    # seconds across reloads; add/delete routes clear the cache
+    counts = get_or_compute(
+        dashboard_counts_cache,
+        'admin',
+        lambda: db.session.query(
+            live_count(Faculty).label('faculty_count'),
+            live_count(Student).label('student_count'),
+            live_count(Subject).label('subject_count'),
+            live_count(Section).label('section_count')
+        ).one()._asdict()
+    )
     
-    return render_template('admin_dashboard.html',
-                         faculty_count=faculty_count,
-                         student_count=student_count,
-                         subject_count=subject_count,
-                         section_count=section_count)
+    return render_template('admin_dashboard.html', **counts)
 
 
 # ---------------------------------------------
@@ -1448,19 +1610,51 @@ def admin_dashboard():
 @admin_required
 def admin_faculty():
     """List all faculty with their subjects"""
-    faculty_list = Faculty.query.filter_by(is_deleted=False).all()
+    # Load everything the cards show up front; raiseload('*') makes any other
+    # relationship touched by the template fail loudly instead of lazy loading per card
+    faculty_list = Faculty.query.options(
+        joinedload(Faculty.program), raiseload('*')
+    ).filter_by(is_deleted=False).all()
+    
+    # Get subjects for all faculty in one query (Faculty.allocations is dynamic,
+    # so it can't be eager loaded) and group them per faculty
+    allocations = SubjectAllocation.query.join(
+        Subject, Subject.subject_id == SubjectAllocation.subject_id
+    ).join(
+        Faculty, Faculty.faculty_id == SubjectAllocation.faculty_id
+    ).options(
+        contains_eager(SubjectAllocation.subject), raiseload('*')
+    ).filter(
+        SubjectAllocation.is_deleted == False,
+        Subject.is_deleted == False,
+        Faculty.is_deleted == False
+    ).all()
+    subjects_by_faculty = defaultdict(list)
+    for alloc in allocations:
+        subjects_by_faculty[alloc.faculty_id].append(alloc.subject)
     
-    # Get subjects for each faculty
     for faculty in faculty_list:
-        allocations = SubjectAllocation.query.filter_by(
-            faculty_id=faculty.faculty_id,
-            is_deleted=False
-        ).all()
-        faculty.subjects = [alloc.subject for alloc in allocations if alloc.subject and not alloc.subject.is_deleted]
+        faculty.subjects = subjects_by_faculty[faculty.faculty_id]
     
     return render_template('admin_faculty.html', faculty_list=faculty_list, programs=Program.query.filter_by(is_deleted=False).order_by(Program.program_name).all())
 
 
+def faculty_form_context():
+    """
+    Subjects, programs and sections for the faculty add/edit form.
+    Loaded once per render, including when re-rendering after an error.
+    """
+    return {
+        'subjects': Subject.query.filter_by(is_deleted=False).all(),
+        'programs': Program.query.filter_by(is_deleted=False).all(),
+        # The form's section picker only needs these columns; Section.to_dict()
+        # would lazy load program, class teacher and a student count per row
+        'sections': [row._asdict() for row in Section.query.filter_by(is_deleted=False).with_entities(
+            Section.section_id, Section.section_name, Section.program_id, Section.current_semester
+        )]
+    }
+
+
 @app.route('/admin/faculty/add', methods=['GET', 'POST'])
 @admin_required
 def admin_faculty_add():
@@ -1480,35 +1674,38 @@ def admin_faculty_add():
             password = request.form.get('password')
             subject_ids = request.form.getlist('subjects')
             
-            # Check if employee_id or username already exists
-            existing_faculty = Faculty.query.filter_by(employee_id=employee_id).first()
-            if existing_faculty:
+            # Check if employee_id or username already exists, both in one SELECT
+            taken = db.session.query(
+                Faculty.query.filter_by(employee_id=employee_id).exists().label('employee_id'),
+                User.query.filter_by(username=username).exists().label('username')
+            ).one()
+            if taken.employee_id:
                 return render_template('admin_faculty_form.html', 
-                                     subjects=Subject.query.filter_by(is_deleted=False).all(),
+                                     **faculty_form_context(),
+                                     faculty_allocations={},
                                      error='Employee ID already exists')
             
-            existing_user = User.query.filter_by(username=username).first()
-            if existing_user:
+            if taken.username:
                 return render_template('admin_faculty_form.html',
-                                     subjects=Subject.query.filter_by(is_deleted=False).all(),
+                                     **faculty_form_context(),
+                                     faculty_allocations={},
                                      error='Username already exists')
             
             # Create user account
-            from werkzeug.security import generate_password_hash
             faculty_role = Role.query.filter_by(role_name='faculty').first()
             
             new_user = User(
                 username=username,
                 email=email,
-                password_hash=generate_password_hash(password),
+                password_hash=hash_password(password),
                 role_id=faculty_role.role_id
             )
             db.session.add(new_user)
-            db.session.flush()
             
-            # Create faculty record
+            # Create faculty record (linked through the relationship, so the
+            # user row is inserted first in the same flush)
             new_faculty = Faculty(
-                user_id=new_user.user_id,
+                user=new_user,
                 employee_id=employee_id,
                 first_name=first_name,
                 last_name=last_name,
@@ -1520,36 +1717,31 @@ def admin_faculty_add():
                 qualification=qualification
             )
             db.session.add(new_faculty)
-            db.session.flush()
             
-            # Assign subjects with specific sections
-            for subject_id in subject_ids:
-                section_id = request.form.get(f'section_{subject_id}')
-                allocation = SubjectAllocation(
-                    subject_id=subject_id,
-                    faculty_id=new_faculty.faculty_id,
-                    section_id=section_id if section_id else None
-                )
-                db.session.add(allocation)
+            # Assign subjects with specific sections (one batched INSERT)
+            if subject_ids:
+                db.session.flush()  # Get faculty ID for the allocation rows
+                allocation_rows = [{
+                    'subject_id': subject_id,
+                    'faculty_id': new_faculty.faculty_id,
+                    'section_id': request.form.get(f'section_{subject_id}') or None
+                } for subject_id in subject_ids]
+                db.session.execute(db.insert(SubjectAllocation), allocation_rows)
             
             db.session.commit()
+            invalidate(dashboard_counts_cache)
             return redirect(url_for('admin_faculty'))
             
         except Exception as e:
             db.session.rollback()
             return render_template('admin_faculty_form.html',
-                                 subjects=Subject.query.filter_by(is_deleted=False).all(),
+                                 **faculty_form_context(),
+                                 faculty_allocations={},
                                  error=str(e))
     
     # GET request
-    subjects = Subject.query.filter_by(is_deleted=False).all()
-    programs = Program.query.filter_by(is_deleted=False).all()
-    sections = Section.query.filter_by(is_deleted=False).all()
-    
     return render_template('admin_faculty_form.html', 
-                         subjects=subjects, 
-                         programs=programs,
-                         sections=[s.to_dict() for s in sections],
+                         **faculty_form_context(),
                          faculty_allocations={})
 
 
@@ -1575,49 +1767,50 @@ def admin_faculty_edit(faculty_id):
             workload = request.form.get('workload_hours_per_week', 0)
             faculty.workload_hours_per_week = int(workload) if workload else 0
             
-            # Update subject allocations
-            subject_ids = request.form.getlist('subjects')
-            
-            # Remove old allocations
-            SubjectAllocation.query.filter_by(faculty_id=faculty_id).delete()
+            # Update subject allocations: section chosen for each selected subject
+            new_sections = {
+                subject_id: request.form.get(f'section_{subject_id}') or None
+                for subject_id in request.form.getlist('subjects')
+            }
             
-            # Add new allocations with sections
-            for subject_id in subject_ids:
-                section_id = request.form.get(f'section_{subject_id}')
-                allocation = SubjectAllocation(
-                    subject_id=subject_id,
-                    faculty_id=faculty_id,
-                    section_id=section_id if section_id else None
-                )
-                db.session.add(allocation)
+            # Only write what changed: keep one allocation per still-selected
+            # subject (moving its section if needed), remove the rest
+            for allocation in SubjectAllocation.query.filter_by(faculty_id=faculty_id).all():
+                if allocation.subject_id not in new_sections:
+                    db.session.delete(allocation)
+                    continue
+                allocation.section_id = new_sections.pop(allocation.subject_id)
+                allocation.is_deleted = False
+            
+            # Add allocations for newly selected subjects (one batched INSERT)
+            allocation_rows = [{
+                'subject_id': subject_id,
+                'faculty_id': faculty_id,
+                'section_id': section_id
+            } for subject_id, section_id in new_sections.items()]
+            if allocation_rows:
+                db.session.execute(db.insert(SubjectAllocation), allocation_rows)
             
             db.session.commit()
             return redirect(url_for('admin_faculty'))
             
         except Exception as e:
             db.session.rollback()
-            subjects = Subject.query.filter_by(is_deleted=False).all()
             allocations = SubjectAllocation.query.filter_by(faculty_id=faculty_id).all()
-            faculty_subject_ids = [a.subject_id for a in allocations]
             return render_template('admin_faculty_form.html', 
                                  faculty=faculty,
-                                 subjects=subjects,
-                                 faculty_subject_ids=faculty_subject_ids,
+                                 **faculty_form_context(),
+                                 faculty_subject_ids=[a.subject_id for a in allocations],
+                                 faculty_allocations={a.subject_id: a.section_id for a in allocations},
                                  error=str(e))
     
     # GET request
-    subjects = Subject.query.filter_by(is_deleted=False).all()
-    programs = Program.query.filter_by(is_deleted=False).all()
-    sections = Section.query.filter_by(is_deleted=False).all()
-    
     allocations = SubjectAllocation.query.filter_by(faculty_id=faculty_id, is_deleted=False).all()
     faculty_allocations = {a.subject_id: a.section_id for a in allocations}
     
     return render_template('admin_faculty_form.html', 
                          faculty=faculty,
-                         subjects=subjects,
-                         programs=programs,
-                         sections=[s.to_dict() for s in sections],
+                         **faculty_form_context(),
                          faculty_subject_ids=list(faculty_allocations.keys()),
                          faculty_allocations=faculty_allocations)
 
@@ -1627,10 +1820,18 @@ def admin_faculty_edit(faculty_id):
 def api_delete_faculty(faculty_id):
     """Delete faculty (soft delete)"""
     try:
-        faculty = Faculty.query.get_or_404(faculty_id)
-        faculty.is_deleted = True
-        faculty.user.is_deleted = True
+        # Soft delete the faculty and its user account with two UPDATEs and no
+        # SELECT; the user is matched through a subquery on faculties
+        updated = Faculty.query.filter_by(faculty_id=faculty_id).update(
+            {'is_deleted': True}, synchronize_session=False
+        )
+        if not updated:
+            return jsonify({'success': False, 'error': 'Faculty not found'}), 404
+        User.query.filter(User.user_id.in_(
+            db.session.query(Faculty.user_id).filter_by(faculty_id=faculty_id)
+        )).update({'is_deleted': True}, synchronize_session=False)
         db.session.commit()
+        invalidate(dashboard_counts_cache)
         return jsonify({'success': True})
     except Exception as e:
         db.session.rollback()
@@ -1682,19 +1883,37 @@ def api_reset_faculty_password(faculty_id):
 @admin_required
 def admin_students():
     """List all students"""
-    students = Student.query.filter_by(is_deleted=False).all()
-    programs = Program.query.filter_by(is_deleted=False).all()
-    sections = Section.query.filter_by(is_deleted=False).all()
+    # Only the columns the student cards show, with program and section names
+    # joined in, instead of full Student objects lazy loading both per card
+    students_query = Student.query.filter_by(is_deleted=False).outerjoin(
+        Program, Student.program_id == Program.program_id
+    ).outerjoin(
+        Section, Student.section_id == Section.section_id
+    ).with_entities(
+        Student.student_id, Student.name, Student.roll_number, Student.email, Student.status,
+        Student.program_id, Student.section_id,
+        Program.program_name, Section.section_name
+    )
+    programs = Program.query.filter_by(is_deleted=False).with_entities(
+        Program.program_id, Program.program_name
+    ).all()
+    sections = Section.query.filter_by(is_deleted=False).with_entities(
+        Section.section_id, Section.section_name, Section.program_id
+    ).all()
     
-    total_students = len(students)
     sections_count = len(sections)
     programs_count = len(programs)
     
-    return render_template('admin_students.html',
-                         students=students,
+    # Stream the page so cards are rendered as student rows arrive, 500 at a
+    # time, rather than holding the whole cohort in memory. Flashes are popped
+    # here, before streaming starts, so the cleared session is what gets
+    # saved; the template renders this list instead of get_flashed_messages().
+    # The total is counted from the cards in the browser.
+    return stream_template('admin_students.html',
+                         students=students_query.yield_per(500),
+                         flashes=get_flashed_messages(with_categories=True),
                          programs=programs,
                          sections=sections,
-                         total_students=total_students,
                          sections_count=sections_count,
                          programs_count=programs_count)
 
@@ -1722,55 +1941,59 @@ def admin_student_add():
             password = request.form.get('password')
             
             # Generate Temp USN if empty
-            if not roll_number:
-                import random
-                import string
-                # Generate unique temp ID: TMP-YYYY-XXXXX
-                year_suffix = datetime.now().year
-                rand_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
-                roll_number = f"TMP-{year_suffix}-{rand_str}"
+            generated_roll_number = not roll_number
+            if generated_roll_number:
+                # Temp ID: TMP-YYYY-XXXXXXXX with 32 random bits, so a clash is
+                # left to the unique constraints rather than checked up front
+                roll_number = f"TMP-{datetime.now().year}-{secrets.token_hex(4).upper()}"
             
             # Auto-set username if empty
             if not username:
                 username = roll_number
 
-            # Check if roll_number or username exists
-            existing_student = Student.query.filter_by(roll_number=roll_number).first()
-            if existing_student:
+            # Check if roll_number or username exists, all checks in one SELECT
+            checks = {}
+            if not generated_roll_number:
+                checks['roll_number'] = Student.query.filter_by(roll_number=roll_number).exists()
+            if not (generated_roll_number and username == roll_number):
+                checks['username'] = User.query.filter_by(username=username).exists()
+            taken = db.session.query(
+                *(check.label(name) for name, check in checks.items())
+            ).one()._asdict() if checks else {}
+
+            if taken.get('roll_number'):
                 return render_template('admin_student_form.html',
                                      programs=Program.query.filter_by(is_deleted=False).all(),
                                      sections=Section.query.filter_by(is_deleted=False).all(),
                                      error='Roll number already exists')
             
-            existing_user = User.query.filter_by(username=username).first()
-            if existing_user:
+            if taken.get('username'):
                 return render_template('admin_student_form.html',
                                      programs=Program.query.filter_by(is_deleted=False).all(),
                                      sections=Section.query.filter_by(is_deleted=False).all(),
                                      error='Username already exists')
             
             # Create user account
-            from werkzeug.security import generate_password_hash
             student_role = Role.query.filter_by(role_name='student').first()
             
             new_user = User(
                 username=username,
                 email=email,
-                password_hash=generate_password_hash(password),
+                password_hash=hash_password(password),
                 role_id=student_role.role_id
             )
             db.session.add(new_user)
-            db.session.flush()
             
-            # Create student record
+            # Create student record (linked through the relationship, so the
+            # user row is inserted first in the same flush)
             new_student = Student(
-                user_id=new_user.user_id,
+                user=new_user,
                 roll_number=roll_number,
                 usn=roll_number,
                 name=name, # Changed from first_name, last_name, and name=f"{first_name} {last_name}"
                 email=email,
                 phone=phone,
-                date_of_birth=datetime.strptime(date_of_birth, '%Y-%m-%d').date() if date_of_birth else None,
+                date_of_birth=date.fromisoformat(date_of_birth) if date_of_birth else None,
                 program_id=program_id if program_id else None,
                 section_id=section_id if section_id else None,
                 admission_year=int(admission_year) if admission_year else None,
@@ -1785,13 +2008,10 @@ def admin_student_add():
                 current_academic_year=request.form.get('current_academic_year')
             )
             db.session.add(new_student)
-            db.session.flush()  # Get student ID before creating fee structure
             
             # Auto-create fee structure if minimum fee info provided
             if new_student.seat_type and new_student.joining_academic_year and new_student.current_academic_year:
-                from fee_helpers import assign_fee_to_student
-                from models import FeeStructure
-                import json
+                db.session.flush()  # Get student ID before creating fee structure
                 
                 # Check if it already exists (unlikely in Add, but good for safety)
                 fee_structure = FeeStructure.query.filter_by(
@@ -1830,14 +2050,15 @@ def admin_student_add():
                                 })
                         
                         if additional_fees:
-                            fee_structure.additional_fees = json.dumps(additional_fees)
+                            fee_structure.additional_fees = additional_fees
                             # Recalculate total
-                            additional_total = sum(f['amount'] for f in additional_fees)
+                            additional_total = additional_fees_total(additional_fees)
                             fee_structure.total_fees = fee_structure.base_fees + additional_total
                             # balance is a calculated property
                             db.session.commit()
             
             db.session.commit()
+            invalidate(dashboard_counts_cache)
             
             return redirect(url_for('admin_students'))
             
@@ -1883,7 +2104,7 @@ def admin_student_edit(student_id):
             
             date_of_birth = request.form.get('date_of_birth')
             if date_of_birth:
-                student.date_of_birth = datetime.strptime(date_of_birth, '%Y-%m-%d').date()
+                student.date_of_birth = date.fromisoformat(date_of_birth)
             
             program_id = request.form.get('program_id')
             student.program_id = program_id if program_id else None
@@ -1923,35 +2144,33 @@ def admin_student_edit(student_id):
             # Update or create fee structure if minimum fee info provided
             # Skip fee assignment if student has left (status != 'active')
             if student.status == 'active' and student.seat_type and student.joining_academic_year and student.current_academic_year:
-                from fee_helpers import assign_fee_to_student
-                from models import FeeStructure
-                import json
                 
                 # IMPORTANT: Commit student changes first so assign_fee_to_student reads updated values
                 db.session.flush()
                 
-                # Check if it already exists for this year
-                fee_structure = FeeStructure.query.filter_by(
-                    student_id=student.student_id,
-                    academic_year=student.current_academic_year,
-                    is_deleted=False
-                ).first()
+                def current_fee_structure():
+                    return FeeStructure.query.filter_by(
+                        student_id=student.student_id,
+                        academic_year=student.current_academic_year,
+                        is_deleted=False
+                    ).first()
                 
                 # Create or update fee structure from template if:
                 # 1. Fee structure doesn't exist, OR
                 # 2. Fee-related fields (seat_type, category, quota_type) changed
-                if not fee_structure or fee_fields_changed:
+                # so the existing structure only needs looking up in case 1
+                fee_structure = None if fee_fields_changed else current_fee_structure()
+                if not fee_structure:
                     assign_result = assign_fee_to_student(student.student_id, current_user.user_id)
                     if assign_result['success']:
-                        fee_structure = FeeStructure.query.filter_by(
-                            student_id=student.student_id,
-                            academic_year=student.current_academic_year,
-                            is_deleted=False
-                        ).first()
+                        fee_structure = db.session.get(FeeStructure, assign_result['fee_structure_id'])
                         if fee_fields_changed and fee_structure:
                             flash(f"Base fees updated from template: ₹{fee_structure.base_fees}", "info")
                     else:
                         flash(f"Fee assignment failed: {assign_result.get('error')}", "warning")
+                        if fee_fields_changed:
+                            # Still sync additional fees onto the existing structure
+                            fee_structure = current_fee_structure()
                 
                 if fee_structure:
                     # Parse additional fees from form
@@ -1969,15 +2188,16 @@ def admin_student_edit(student_id):
                             })
                     
                     # Sync additional fees
-                    fee_structure.additional_fees = json.dumps(additional_fees) if additional_fees else None
+                    fee_structure.additional_fees = additional_fees if additional_fees else None
                     
                     # Recalculate total
-                    additional_total = sum(f['amount'] for f in additional_fees)
+                    additional_total = additional_fees_total(additional_fees)
                     fee_structure.total_fees = fee_structure.base_fees + additional_total
                     # balance is a calculated property
                     db.session.flush()
             
             db.session.commit()
+            invalidate(fee_access_cache)
             flash('Student updated successfully' + (' with fee structure' if fee_structure else ''), 'success')
             return redirect(url_for('admin_students'))
             
@@ -2005,7 +2225,6 @@ def admin_student_edit(student_id):
 def admin_delete_fee_structure(fee_structure_id):
     """Delete (hard delete) a fee structure"""
     try:
-        from models import FeeStructure
         
         fee_structure = FeeStructure.query.get(fee_structure_id)
         if not fee_structure:
@@ -2034,7 +2253,6 @@ def admin_delete_fee_structure(fee_structure_id):
 @admin_required
 def api_assign_fee_to_student(student_id):
     """Auto-assign fee to student based on joining year, academic year, and seat type"""
-    from fee_helpers import assign_fee_to_student
     
     current_user = get_current_user()
     result = assign_fee_to_student(student_id, current_user.user_id)
@@ -2049,7 +2267,6 @@ def api_assign_fee_to_student(student_id):
 @admin_required
 def api_add_additional_fee(student_id):
     """Add additional fee to student"""
-    from fee_helpers import add_additional_fee
     
     try:
         data = request.get_json()
@@ -2077,7 +2294,6 @@ def api_add_additional_fee(student_id):
 @admin_required
 def api_remove_additional_fee(student_id, fee_index):
     """Remove additional fee from student"""
-    from fee_helpers import remove_additional_fee
     
     try:
         data = request.get_json()
@@ -2096,34 +2312,61 @@ def api_remove_additional_fee(student_id, fee_index):
         return jsonify({'success': False, 'error': str(e)}), 400
 
 
+def fee_breakdown_access_error(user, student_id):
+    """
+    Return None if user may view student_id's fee breakdown, else (error, status)
+    Decisions are cached per (user_id, student_id); section and student
+    edits clear fee_access_cache.
+    """
+    role_key = user.role.role_key if user.role else None
+    if role_key not in ('student', 'faculty'):
+        return None
+    
+    def compute():
+        if role_key == 'student':
+            # Students can only view their own fees
+            own = db.session.query(
+                Student.query.filter_by(user_id=user.user_id, student_id=student_id).exists()
+            ).scalar()
+            return None if own else ('Unauthorized', 403)
+        
+        # Faculty can view fees of students in their class. The user's
+        # faculty id, the student's section and that section's class teacher
+        # come back as one row of scalar subqueries, in one round trip
+        row = db.session.query(
+            db.select(Faculty.faculty_id).where(
+                Faculty.user_id == user.user_id
+            ).scalar_subquery().label('faculty_id'),
+            db.select(Student.section_id).where(
+                Student.student_id == student_id
+            ).scalar_subquery().label('section_id'),
+            db.select(Section.class_teacher_id).join(
+                Student, Student.section_id == Section.section_id
+            ).where(Student.student_id == student_id).scalar_subquery().label('class_teacher_id')
+        ).one()
+        if not row.faculty_id:
+            return None
+        if not row.section_id:
+            return ('Student not found', 404)
+        if row.class_teacher_id != row.faculty_id:
+            return ('Unauthorized', 403)
+        return None
+    
+    return get_or_compute(fee_access_cache, (user.user_id, student_id), compute)
+
+
 @app.route('/api/students/<student_id>/fee-breakdown')
 @login_required
 def api_get_fee_breakdown(student_id):
     """Get fee breakdown for student (accessible by student, faculty, admin)"""
-    from fee_helpers import get_student_fee_breakdown
     
     current_user = get_current_user()
     
     # Check permissions
-    if current_user.role == 'student':
-        # Students can only view their own fees
-        from models import Student
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
-        if not student or student.student_id != student_id:
-            return jsonify({'success': False, 'error': 'Unauthorized'}), 403
-    elif current_user.role == 'faculty':
-        # Faculty can view fees of students in their class
-        from models import Faculty, Student, Section
-        faculty = Faculty.query.filter_by(user_id=current_user.user_id).first()
-        if faculty:
-            # Check if student is in faculty's class
-            student = Student.query.get(student_id)
-            if not student or not student.section_id:
-                return jsonify({'success': False, 'error': 'Student not found'}), 404
-            
-            section = Section.query.get(student.section_id)
-            if not section or section.class_teacher_id != faculty.faculty_id:
-                return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    access_error = fee_breakdown_access_error(current_user, student_id)
+    if access_error:
+        error, status = access_error
+        return jsonify({'success': False, 'error': error}), status
     
     academic_year = request.args.get('academic_year')
     result = get_student_fee_breakdown(student_id, academic_year)
@@ -2138,18 +2381,11 @@ def api_get_fee_breakdown(student_id):
 def api_bulk_sync_fees():
     """Bulk assign fees to all active students"""
     try:
-        from fee_helpers import assign_fee_to_student
-        from models import Student
         
         students = Student.query.filter_by(is_deleted=False).all()
-        success_count = 0
         current_user = get_current_user()
         
-        for student in students:
-            if student.joining_academic_year and student.current_academic_year and student.seat_type:
-                result = assign_fee_to_student(student.student_id, current_user.user_id)
-                if result['success']:
-                    success_count += 1
+        success_count = bulk_assign_fees(students, current_user.user_id)
                     
         return jsonify({
             'success': True, 
@@ -2157,6 +2393,7 @@ def api_bulk_sync_fees():
             'total_students': len(students)
         })
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 400
 
 # ---------------------------------------------
@@ -2167,7 +2404,6 @@ def api_bulk_sync_fees():
 @admin_required
 def admin_reset_student_password(student_id):
     """Reset a student's password"""
-    from werkzeug.security import generate_password_hash
     
     student = Student.query.get_or_404(student_id)
     
@@ -2177,7 +2413,7 @@ def admin_reset_student_password(student_id):
             return jsonify({'success': False, 'message': 'Password must be at least 6 characters'}), 400
         
         # Update password
-        student.user.password_hash = generate_password_hash(new_password)
+        student.user.password_hash = hash_password(new_password)
         db.session.commit()
         
         return jsonify({'success': True, 'message': 'Password reset successfully'})
@@ -2215,25 +2451,26 @@ def admin_promote_students():
 def api_promote_students():
     """Promote students to next semester"""
     try:
-        from models import StudentEnrollment
-        
         data = request.get_json()
         student_ids = data.get('student_ids', [])
         
-        promoted_count = 0
-        for student_id in student_ids:
-            student = Student.query.get(student_id)
-            if student and student.current_semester < 8:  # Max 8 semesters
-                # Mark current semester enrollments as completed
-                db.session.query(StudentEnrollment).filter_by(
-                    student_id=student_id,
-                    semester_enrolled=student.current_semester,
-                    enrollment_status='active'
-                ).update({'enrollment_status': 'completed'})
-                
-                # Increment semester
-                student.current_semester += 1
-                promoted_count += 1
+        # Two set-based UPDATEs instead of a fetch and update per student
+        # Mark current semester enrollments of promotable students as completed
+        promotable_semester = db.select(Student.current_semester).where(
+            Student.student_id == StudentEnrollment.student_id,
+            Student.current_semester < 8  # Max 8 semesters
+        ).scalar_subquery()
+        db.session.query(StudentEnrollment).filter(
+            StudentEnrollment.student_id.in_(student_ids),
+            StudentEnrollment.semester_enrolled == promotable_semester,
+            StudentEnrollment.enrollment_status == 'active'
+        ).update({'enrollment_status': 'completed'}, synchronize_session=False)
+        
+        # Increment semester
+        promoted_count = Student.query.filter(
+            Student.student_id.in_(student_ids),
+            Student.current_semester < 8
+        ).update({'current_semester': Student.current_semester + 1}, synchronize_session=False)
         
         db.session.commit()
         return jsonify({'success': True, 'promoted_count': promoted_count})
@@ -2247,22 +2484,39 @@ def api_promote_students():
 def api_delete_student(student_id):
     """Delete student (soft or permanent)"""
     try:
-        student = Student.query.get_or_404(student_id)
         permanent = request.args.get('permanent', 'false').lower() == 'true'
         
         if permanent:
+            # Deleted through the ORM so the delete-orphan cascades on the
+            # student's records, enrollments and fees still run; the user is
+            # loaded in the same query
+            student = Student.query.options(joinedload(Student.user)).filter_by(
+                student_id=student_id
+            ).first()
+            if not student:
+                return jsonify({'success': False, 'error': 'Student not found'}), 404
             # Delete associated user if it exists
             if student.user:
                 db.session.delete(student.user)
             # Delete student (cascades or manual depending on foreign keys)
             db.session.delete(student)
         else:
-            # Soft delete
-            student.is_deleted = True
-            if student.user:
-                student.user.is_deleted = True
+            # Soft delete the student and its user account with two UPDATEs
+            # and no SELECT; the user is matched through a subquery on students
+            updated = Student.query.filter_by(student_id=student_id).update(
+                {'is_deleted': True}, synchronize_session=False
+            )
+            if not updated:
+                return jsonify({'success': False, 'error': 'Student not found'}), 404
+            User.query.filter(User.user_id.in_(
+                db.session.query(Student.user_id).filter_by(student_id=student_id)
+            )).update({'is_deleted': True}, synchronize_session=False)
                 
         db.session.commit()
+        invalidate(dashboard_counts_cache)
+        if permanent:
+            # The student's attendance records went with it
+            invalidate(work_diary_cache)
         return jsonify({'success': True, 'message': 'Student deleted ' + ('permanently' if permanent else 'softly')})
     except Exception as e:
         db.session.rollback()
@@ -2293,6 +2547,7 @@ def api_create_section():
         
         db.session.add(new_section)
         db.session.commit()
+        invalidate(dashboard_counts_cache)
         
         return jsonify({'success': True, 'section': {
             'section_id': new_section.section_id,
@@ -2319,6 +2574,7 @@ def api_update_section(section_id):
         section.class_teacher_id = data.get('class_teacher_id') if data.get('class_teacher_id') else None
         
         db.session.commit()
+        invalidate(fee_access_cache)
         
         return jsonify({'success': True, 'section': {
             'section_id': section.section_id,
@@ -2335,18 +2591,22 @@ def api_update_section(section_id):
 def api_get_section(section_id):
     """Get section details"""
     try:
-        section = Section.query.get_or_404(section_id)
+        # Only the returned columns are selected; no Section instance is built
+        section = Section.query.with_entities(
+            Section.section_id,
+            Section.section_name,
+            Section.program_id,
+            Section.academic_year,
+            Section.current_semester,
+            Section.class_teacher_id
+        ).filter_by(section_id=section_id).first()
+        
+        if section is None:
+            return jsonify({'success': False, 'error': 'Section not found'}), 404
         
         return jsonify({
             'success': True,
-            'section': {
-                'section_id': section.section_id,
-                'section_name': section.section_name,
-                'program_id': section.program_id,
-                'academic_year': section.academic_year,
-                'current_semester': section.current_semester,
-                'class_teacher_id': section.class_teacher_id
-            }
+            'section': section._asdict()
         })
         
     except Exception as e:
@@ -2358,9 +2618,10 @@ def api_get_section(section_id):
 def api_delete_section(section_id):
     """Delete section (soft delete)"""
     try:
-        section = Section.query.get_or_404(section_id)
-        section.is_deleted = True
+        if not soft_delete(Section, section_id=section_id):
+            return jsonify({'success': False, 'error': 'Section not found'}), 404
         db.session.commit()
+        invalidate(dashboard_counts_cache)
         
         return jsonify({'success': True})
         
@@ -2376,20 +2637,22 @@ def api_delete_section(section_id):
 @app.route('/admin/subjects')
 @admin_required
 def admin_subjects():
-    """List all subjects with hierarchy"""
-    from models import Unit, Chapter, Concept
+    """List all subjects"""
     
-    subjects = Subject.query.filter_by(is_deleted=False).all()
+    # The cards only read plain columns, so pass dicts rather than Subject instances
+    subjects = [row._asdict() for row in Subject.query.filter_by(is_deleted=False).with_entities(
+        Subject.subject_id, Subject.subject_code, Subject.subject_name, Subject.semester_id,
+        Subject.credits, Subject.subject_type, Subject.subject_category, Subject.program_id
+    )]
     
-    # Load full hierarchy for each subject
-    for subject in subjects:
-        subject.units = Unit.query.filter_by(subject_id=subject.subject_id, is_deleted=False).order_by(Unit.unit_number).all()
-        for unit in subject.units:
-            unit.chapters = Chapter.query.filter_by(unit_id=unit.unit_id, is_deleted=False).order_by(Chapter.chapter_number).all()
-            for chapter in unit.chapters:
-                chapter.concepts = Concept.query.filter_by(chapter_id=chapter.chapter_id, is_deleted=False).all()
+    # The cards show no units, chapters or concepts, only enrolment counts:
+    # one grouped query for all cards instead of a COUNT per card
+    enrolled_counts = dict(db.session.query(
+        StudentSubjectEnrollment.subject_id, db.func.count()
+    ).filter_by(is_deleted=False).group_by(StudentSubjectEnrollment.subject_id).all())
     
-    return render_template('admin_subjects.html', subjects=subjects, programs=Program.query.filter_by(is_deleted=False).order_by(Program.program_name).all())
+    return render_template('admin_subjects.html', subjects=subjects, enrolled_counts=enrolled_counts,
+                           programs=Program.query.filter_by(is_deleted=False).order_by(Program.program_name).all())
 
 
 @app.route('/admin/sections')
@@ -2400,9 +2663,12 @@ def admin_sections():
     programs = Program.query.filter_by(is_deleted=False).all()
     faculties = Faculty.query.filter_by(is_deleted=False).order_by(Faculty.first_name).all()
     
-    # Calculate student counts and get class teacher info
+    # Calculate student counts with one grouped query
+    student_counts = dict(db.session.query(
+        Student.section_id, db.func.count(Student.student_id)
+    ).filter_by(is_deleted=False).group_by(Student.section_id).all())
     for section in sections:
-        section.student_count = Student.query.filter_by(section_id=section.section_id, is_deleted=False).count()
+        section.student_count = student_counts.get(section.section_id, 0)
         
     return render_template('admin_sections.html', sections=sections, programs=programs, faculties=faculties)
 
@@ -2422,13 +2688,6 @@ def admin_subject_add():
             subject_type = request.form.get('subject_type')
             total_hours = request.form.get('total_hours')
             
-            # Check if subject code exists
-            existing_subject = Subject.query.filter_by(subject_code=subject_code).first()
-            if existing_subject:
-                return render_template('admin_subject_form.html',
-                                     programs=Program.query.filter_by(is_deleted=False).all(),
-                                     error='Subject code already exists')
-            
             new_subject = Subject(
                 subject_code=subject_code,
                 code=subject_code,
@@ -2445,7 +2704,19 @@ def admin_subject_add():
                 carries_section=True if request.form.get('carries_section') == 'true' else False
             )
             db.session.add(new_subject)
-            db.session.commit()
+            
+            # subject_code is unique in the database, so a taken code fails
+            # the insert itself
+            try:
+                db.session.commit()
+            except IntegrityError as e:
+                db.session.rollback()
+                if subject_code is None or 'subject_code' not in str(e.orig):
+                    raise
+                return render_template('admin_subject_form.html',
+                                     programs=Program.query.filter_by(is_deleted=False).all(),
+                                     error='Subject code already exists')
+            invalidate(dashboard_counts_cache)
             
             return redirect(url_for('admin_subjects'))
             
@@ -2515,9 +2786,10 @@ def admin_subject_edit(subject_id):
 def api_delete_subject(subject_id):
     """Delete subject (soft delete)"""
     try:
-        subject = Subject.query.get_or_404(subject_id)
-        subject.is_deleted = True
+        if not soft_delete(Subject, subject_id=subject_id):
+            return jsonify({'success': False, 'error': 'Subject not found'}), 404
         db.session.commit()
+        invalidate(dashboard_counts_cache)
         return jsonify({'success': True})
     except Exception as e:
         db.session.rollback()
@@ -2536,47 +2808,42 @@ def auto_enroll_subject(subject_id):
     Eligibility: Active students where current_semester matches subject.semester_id
     """
     try:
-        from models import StudentEnrollment
-        from datetime import datetime
-        
         subject = Subject.query.get_or_404(subject_id)
         
-        # Find eligible students  
+        # Find eligible students that are not already enrolled
+        already_enrolled = db.session.query(StudentEnrollment.student_id).filter_by(
+            subject_id=subject_id,
+            is_deleted=False
+        )
         eligible_students = Student.query.filter_by(
             program_id=subject.program_id,
             current_semester=subject.semester_id,
             status='active',
             is_deleted=False
+        ).filter(
+            ~Student.student_id.in_(already_enrolled)
+        ).with_entities(
+            Student.student_id, Student.section_id, Student.current_semester
         ).all()
         
-        enrolled_count = 0
-        for student in eligible_students:
-            # Check if already enrolled
-            existing = db.session.query(StudentEnrollment).filter_by(
-                student_id=student.student_id,
-                subject_id=subject_id,
-                is_deleted=False
-            ).first()
-            
-            if not existing:
-                # Get current academic year
-                now = datetime.now()
-                academic_year = f"{now.year}-{str(now.year + 1)[-2:]}" if now.month >= 6 else f"{now.year - 1}-{str(now.year)[-2:]}"
-                
-                enrollment = StudentEnrollment(
-                    student_id=student.student_id,
-                    subject_id=subject_id,
-                    section_id=student.section_id,
-                    enrollment_type='core',
-                    enrollment_status='active',
-                    semester_enrolled=student.current_semester,
-                    academic_year=academic_year
-                )
-                db.session.add(enrollment)
-                enrolled_count += 1
+        # Get current academic year
+        academic_year = enrollment_academic_year()
+        
+        # Insert all enrollments in one executemany
+        enrollments = [{
+            'student_id': student.student_id,
+            'subject_id': subject_id,
+            'section_id': student.section_id,
+            'enrollment_type': 'core',
+            'enrollment_status': 'active',
+            'semester_enrolled': student.current_semester,
+            'academic_year': academic_year
+        } for student in eligible_students]
+        if enrollments:
+            db.session.execute(db.insert(StudentEnrollment), enrollments)
         
         db.session.commit()
-        return jsonify({'success': True, 'enrolled_count': enrolled_count})
+        return jsonify({'success': True, 'enrolled_count': len(enrollments)})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 400
@@ -2586,35 +2853,29 @@ def auto_enroll_subject(subject_id):
 @admin_required
 def admin_enroll_students(subject_id):
     """Page for manually enrolling students in elective subjects"""
-    from models import StudentEnrollment
-    
     subject = Subject.query.get_or_404(subject_id)
     
-    # Debug output
-    print(f"DEBUG ENROLLMENT:")
-    print(f"  Subject: {subject.subject_name}")
-    print(f"  Program ID: {subject.program_id}")
-    print(f"  Semester ID: {subject.semester_id} (type: {type(subject.semester_id)})")
-    
     # Get active students matching program and semester
-    eligible_students = Student.query.filter_by(
+    eligible_students = Student.query.options(joinedload(Student.section)).filter_by(
         program_id=subject.program_id,
         current_semester=subject.semester_id,
         status='active',
         is_deleted=False
     ).all()
     
-    print(f"  Found {len(eligible_students)} eligible students")
-    
-    # Also check all students in program
-    all_program_students = Student.query.filter_by(
-        program_id=subject.program_id,
-        status='active',
-        is_deleted=False
-    ).all()
-    print(f"  Total students in program: {len(all_program_students)}")
-    for s in all_program_students[:5]:  # Show first 5
-        print(f"    - {s.roll_number}: semester={s.current_semester} (type: {type(s.current_semester)})")
+    if app.debug:
+        # Diagnostics for semester mismatches; a small sample is enough
+        app.logger.debug(
+            "Enrollment page: subject=%s program_id=%s semester_id=%r, %d eligible students",
+            subject.subject_name, subject.program_id, subject.semester_id, len(eligible_students)
+        )
+        sample_students = Student.query.filter_by(
+            program_id=subject.program_id,
+            status='active',
+            is_deleted=False
+        ).limit(5).all()
+        for s in sample_students:
+            app.logger.debug("  %s: semester=%r", s.roll_number, s.current_semester)
     
     # Get already enrolled student IDs
     enrolled_ids_query = db.session.query(StudentEnrollment.student_id).filter_by(
@@ -2626,8 +2887,11 @@ def admin_enroll_students(subject_id):
     # Filter available students
     available_students = [s for s in eligible_students if s.student_id not in enrolled_student_ids]
     
-    # Get enrolled students with their enrollment details
-    enrollments = db.session.query(StudentEnrollment).filter_by(
+    # Get enrolled students with their enrollment details; the template shows
+    # each student's name and section, so join both in
+    enrollments = db.session.query(StudentEnrollment).options(
+        joinedload(StudentEnrollment.student).joinedload(Student.section)
+    ).filter_by(
         subject_id=subject_id,
         is_deleted=False
     ).all()
@@ -2644,35 +2908,32 @@ def admin_enroll_students(subject_id):
 def api_add_enrollments():
     """Enroll multiple students in a subject"""
     try:
-        from models import StudentEnrollment
-        from datetime import datetime
-        
         data = request.get_json()
         subject_id = data.get('subject_id')
         student_ids = data.get('student_ids', [])
         
         # Get current academic year
-        now = datetime.now()
-        academic_year = f"{now.year}-{str(now.year + 1)[-2:]}" if now.month >= 6 else f"{now.year - 1}-{str(now.year)[-2:]}"
+        academic_year = enrollment_academic_year()
         
-        enrolled_count = 0
-        for student_id in student_ids:
-            student = Student.query.get(student_id)
-            if student:
-                enrollment = StudentEnrollment(
-                    student_id=student_id,
-                    subject_id=subject_id,
-                    section_id=student.section_id,
-                    enrollment_type='elective',
-                    enrollment_status='active',
-                    semester_enrolled=student.current_semester,
-                    academic_year=academic_year
-                )
-                db.session.add(enrollment)
-                enrolled_count += 1
+        # Load the selected students in one query and insert all enrollments
+        # in one executemany
+        students = Student.query.filter(Student.student_id.in_(student_ids)).with_entities(
+            Student.student_id, Student.section_id, Student.current_semester
+        ).all()
+        enrollments = [{
+            'student_id': student.student_id,
+            'subject_id': subject_id,
+            'section_id': student.section_id,
+            'enrollment_type': 'elective',
+            'enrollment_status': 'active',
+            'semester_enrolled': student.current_semester,
+            'academic_year': academic_year
+        } for student in students]
+        if enrollments:
+            db.session.execute(db.insert(StudentEnrollment), enrollments)
         
         db.session.commit()
-        return jsonify({'success': True, 'enrolled_count': enrolled_count})
+        return jsonify({'success': True, 'enrolled_count': len(enrollments)})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 400
@@ -2683,10 +2944,8 @@ def api_add_enrollments():
 def api_delete_enrollment(enrollment_id):
     """Remove student enrollment"""
     try:
-        from models import StudentEnrollment
-        
-        enrollment = db.session.query(StudentEnrollment).get_or_404(enrollment_id)
-        enrollment.is_deleted = True
+        if not soft_delete(StudentEnrollment, enrollment_id=enrollment_id):
+            return jsonify({'success': False, 'error': 'Enrollment not found'}), 404
         db.session.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -2700,7 +2959,6 @@ def api_delete_enrollment(enrollment_id):
 def api_create_unit():
     """Create a unit within a subject"""
     try:
-        from models import Unit
         data = request.get_json()
         
         unit = Unit(
@@ -2722,9 +2980,8 @@ def api_create_unit():
 def api_delete_unit(unit_id):
     """Delete unit (soft delete)"""
     try:
-        from models import Unit
-        unit = Unit.query.get_or_404(unit_id)
-        unit.is_deleted = True
+        if not soft_delete(Unit, unit_id=unit_id):
+            return jsonify({'success': False, 'error': 'Unit not found'}), 404
         db.session.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -2737,7 +2994,6 @@ def api_delete_unit(unit_id):
 def api_create_chapter():
     """Create a chapter within a unit"""
     try:
-        from models import Chapter
         data = request.get_json()
         
         chapter = Chapter(
@@ -2759,9 +3015,8 @@ def api_create_chapter():
 def api_delete_chapter(chapter_id):
     """Delete chapter (soft delete)"""
     try:
-        from models import Chapter
-        chapter = Chapter.query.get_or_404(chapter_id)
-        chapter.is_deleted = True
+        if not soft_delete(Chapter, chapter_id=chapter_id):
+            return jsonify({'success': False, 'error': 'Chapter not found'}), 404
         db.session.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -2774,7 +3029,6 @@ def api_delete_chapter(chapter_id):
 def api_create_concept():
     """Create a concept within a chapter"""
     try:
-        from models import Concept
         data = request.get_json()
         
         concept = Concept(
@@ -2795,9 +3049,8 @@ def api_create_concept():
 def api_delete_concept(concept_id):
     """Delete concept (soft delete)"""
     try:
-        from models import Concept
-        concept = Concept.query.get_or_404(concept_id)
-        concept.is_deleted = True
+        if not soft_delete(Concept, concept_id=concept_id):
+            return jsonify({'success': False, 'error': 'Concept not found'}), 404
         db.session.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -2815,12 +3068,12 @@ def admin_programs():
     """List all programs (departments)"""
     programs = Program.query.filter_by(is_deleted=False).all()
     
-    # Calculate section counts for each program
+    # Calculate section counts for all programs with one grouped query
+    section_counts = dict(db.session.query(
+        Section.program_id, db.func.count(Section.section_id)
+    ).filter_by(is_deleted=False).group_by(Section.program_id).all())
     for program in programs:
-        program.section_count = Section.query.filter_by(
-            program_id=program.program_id, 
-            is_deleted=False
-        ).count()
+        program.section_count = section_counts.get(program.program_id, 0)
     
     return render_template('admin_programs.html', programs=programs)
 
@@ -2830,7 +3083,7 @@ def admin_programs():
 def api_create_program():
     """Create a new program"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         
         # Validate required fields
         program_code = data.get('program_code')
@@ -2842,18 +3095,6 @@ def api_create_program():
                 'error': 'Program code and name are required'
             }), 400
         
-        # Check if program code already exists
-        existing = Program.query.filter_by(
-            program_code=program_code, 
-            is_deleted=False
-        ).first()                                                                                                     
-        
-        if existing:
-            return jsonify({
-                'success': False, 
-                'error': f'Program code "{program_code}" already exists'
-            }), 400
-        
         program = Program(
             program_code=program_code,
             program_name=program_name,
@@ -2862,7 +3103,19 @@ def api_create_program():
             duration=int(data.get('duration_years', 3))
         )
         db.session.add(program)
-        db.session.commit()
+        
+        # program_code is unique in the database, so a taken code (including
+        # one held by a deleted program) fails the insert itself
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            if 'program_code' not in str(e.orig):
+                raise
+            return jsonify({
+                'success': False, 
+                'error': f'Program code "{program_code}" already exists'
+            }), 400
         
         return jsonify({
             'success': True, 
@@ -2879,25 +3132,42 @@ def api_create_program():
         return jsonify({'success': False, 'error': str(e)}), 400
 
 
+def program_etag(program_id, updated_at):
+    """ETag for a program's details; changes whenever the row is updated"""
+    return f'{program_id}-{updated_at}'
+
+
 @app.route('/api/admin/programs/<program_id>', methods=['GET'])
 @admin_required
 def api_get_program(program_id):
     """Get program details"""
     try:
-        program = Program.query.get_or_404(program_id)
-        
-        if program.is_deleted:
+        # Only the returned columns are selected; no Program instance is built
+        program = Program.query.with_entities(
+            Program.program_id,
+            Program.program_code,
+            Program.program_name,
+            Program.duration_years,
+            Program.updated_at
+        ).filter_by(program_id=program_id, is_deleted=False).first()
+        
+        if program is None:
             return jsonify({'success': False, 'error': 'Program not found'}), 404
         
-        return jsonify({
-            'success': True,
-            'program': {
-                'program_id': program.program_id,
-                'program_code': program.program_code,
-                'program_name': program.program_name,
-                'duration_years': program.duration_years
-            }
-        })
+        etag = program_etag(program.program_id, program.updated_at)
+        if etag in request.if_none_match:
+            response = make_response('', 304)
+        else:
+            details = program._asdict()
+            del details['updated_at']
+            response = jsonify({
+                'success': True,
+                'program': details
+            })
+        # Clients revalidate each time and get a 304 while the program is unchanged
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
@@ -2913,7 +3183,7 @@ def api_update_program(program_id):
         if program.is_deleted:
             return jsonify({'success': False, 'error': 'Program not found'}), 404
         
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         
         # Update fields
         if 'program_name' in data:
@@ -2925,34 +3195,35 @@ def api_update_program(program_id):
             program.duration_years = duration
             program.duration = duration
         
+        synced_students = synced_faculty = 0
         if 'current_academic_year' in data:
             new_academic_year = data['current_academic_year']
             program.current_academic_year = new_academic_year
             
-            # Sync to all students in this program
-            students = Student.query.filter_by(program_id=program_id, is_deleted=False).all()
-            for student in students:
-                student.current_academic_year = new_academic_year
-                
-                # Trigger fee re-assignment for the new academic year
-                if student.seat_type and student.joining_academic_year:
-                    try:
-                        from fee_helpers import assign_fee_to_student
-                        assign_fee_to_student(student.student_id)
-                    except Exception as e:
-                        print(f"Fee assignment failed for {student.student_id}: {str(e)}")
-            
-            # Sync to all faculty in this program
-            faculties = Faculty.query.filter_by(program_id=program_id, is_deleted=False).all()
-            for faculty in faculties:
-                faculty.current_academic_year = new_academic_year
+            # Sync to all students in this program with one UPDATE
+            synced_students = Student.query.filter_by(program_id=program_id, is_deleted=False).update(
+                {'current_academic_year': new_academic_year}, synchronize_session=False
+            )
+            
+            # Sync to all faculty in this program with one UPDATE
+            synced_faculty = Faculty.query.filter_by(program_id=program_id, is_deleted=False).update(
+                {'current_academic_year': new_academic_year}, synchronize_session=False
+            )
+            
+            # Re-assign fees for the new academic year in bulk; bulk_assign_fees
+            # only reads these columns, so plain rows are enough. It commits
+            # per batch, so the syncs above are committed with the first one
+            bulk_assign_fees(Student.query.filter_by(program_id=program_id, is_deleted=False).with_entities(
+                Student.student_id, Student.section_id, Student.joining_academic_year,
+                Student.current_academic_year, Student.seat_type, Student.quota_type
+            ).all(), get_current_user().user_id)
         
         # Note: program_code is typically not editable after creation
         # to maintain referential integrity
         
         db.session.commit()
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'program': {
                 'program_id': program.program_id,
@@ -2962,10 +3233,13 @@ def api_update_program(program_id):
                 'current_academic_year': program.current_academic_year
             },
             'sync_stats': {
-                'students': len(students) if 'current_academic_year' in data else 0,
-                'faculty': len(faculties) if 'current_academic_year' in data else 0
+                'students': synced_students,
+                'faculty': synced_faculty
             }
         })
+        # Same ETag a follow-up GET of this program will carry
+        response.set_etag(program_etag(program.program_id, program.updated_at))
+        return response
         
     except Exception as e:
         db.session.rollback()
@@ -2979,13 +3253,15 @@ def api_delete_program(program_id):
     try:
         program = Program.query.get_or_404(program_id)
         
-        # Check if there are active sections using this program
-        active_sections = Section.query.filter_by(
+        # Check if there are active sections using this program; EXISTS
+        # stops at the first one, the count is only needed for the message
+        sections_query = Section.query.filter_by(
             program_id=program_id, 
             is_deleted=False
-        ).count()
+        )
         
-        if active_sections > 0:
+        if db.session.query(sections_query.exists()).scalar():
+            active_sections = sections_query.count()
             return jsonify({
                 'success': False, 
                 'error': f'Cannot delete program. {active_sections} active section(s) are using this program.'
@@ -3013,12 +3289,39 @@ def admin_assign_students():
     # Get optional program filter from query params
     program_id = request.args.get('program_id')
     
+    # ETag from row counts and latest updated_at of every table on the page,
+    # fetched as one row of scalar subqueries; soft deletes bump updated_at
+    # and hard deletes change the count
+    versioned = [(Program, ())]
+    if program_id:
+        versioned += [(Student, (Student.program_id == program_id,)),
+                      (Section, (Section.program_id == program_id,))]
+    version_columns = []
+    for model, criteria in versioned:
+        version_columns += [
+            db.select(db.func.count()).select_from(model).where(*criteria).scalar_subquery(),
+            db.select(db.func.max(model.updated_at)).where(*criteria).scalar_subquery()
+        ]
+    fingerprint = db.session.query(*version_columns).one()
+    template_mtime = os.path.getmtime(os.path.join(app.root_path, app.template_folder, 'admin_assign_students.html'))
+    etag = hashlib.md5(repr((program_id, tuple(fingerprint), template_mtime)).encode()).hexdigest()
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    
     # Get all programs for the selector
     programs = Program.query.filter_by(is_deleted=False).order_by(Program.program_name).all()
     
     # Filter students and sections by program if specified
     if program_id:
-        students = Student.query.filter_by(
+        # Only the columns the page renders; student.program resolves from
+        # the programs already loaded above
+        students = Student.query.options(load_only(
+            Student.student_id, Student.roll_number, Student.name, Student.program_id,
+            Student.section_id, Student.current_semester, Student.status
+        )).filter_by(
             program_id=program_id,
             is_deleted=False
         ).all()
@@ -3028,7 +3331,7 @@ def admin_assign_students():
         ).all()
         selected_program = Program.query.get(program_id)
         
-        # Get unique semesters from students
+        # Get unique semesters from the students already loaded for the table
         available_semesters = sorted(set(
             s.current_semester for s in students 
             if s.current_semester is not None
@@ -3040,15 +3343,16 @@ def admin_assign_students():
         selected_program = None
         available_semesters = []
     
-    subjects = Subject.query.filter_by(is_deleted=False).all()
-    
-    return render_template('admin_assign_students.html', 
+    response = make_response(render_template('admin_assign_students.html', 
                          students=students, 
                          sections=sections,
-                         subjects=subjects,
                          programs=programs,
                          selected_program=selected_program,
-                         available_semesters=available_semesters)
+                         available_semesters=available_semesters))
+    # Browsers revalidate on every visit and get a 304 while nothing changed
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 @app.route('/api/admin/students/assign-section', methods=['POST'])
@@ -3056,84 +3360,109 @@ def admin_assign_students():
 def api_assign_students_to_section():
     """Bulk assign students to a section"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         student_ids = data.get('student_ids', [])
         section_id = data.get('section_id')
         
         if not student_ids or not section_id:
             return jsonify({'success': False, 'error': 'Missing student_ids or section_id'}), 400
         
-        # Update all students
-        updated_count = 0
-        for student_id in student_ids:
-            student = Student.query.get(student_id)
-            if student:
-                student.section_id = section_id
-                updated_count += 1
+        # Update all students with one UPDATE; unknown ids simply don't match
+        updated_count = Student.query.filter(Student.student_id.in_(student_ids)).update(
+            {'section_id': section_id}, synchronize_session=False
+        )
         
         db.session.commit()
+        invalidate(fee_access_cache)
         return jsonify({'success': True, 'updated': updated_count})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 400
 
 
+# Students updated per transaction, so row locks are held only briefly
+SECTION_UPDATE_BATCH_SIZE = 200
+
+
 @app.route('/api/admin/students/update-sections', methods=['POST'])
 @admin_required
 def api_update_student_sections():
-    """Bulk update student sections with attendance transfer logic"""
+    """Bulk update student sections with attendance transfer logic
+    Commits every SECTION_UPDATE_BATCH_SIZE students, so on error the
+    response reports how many were already updated"""
+    updated_count = 0
     try:
-        data = request.get_json()
-        assignments = data.get('assignments', [])
+        data = request.get_json(silent=True) or {}
+        # Unpack the payload once into (student_id, section_id) pairs
+        assignments = [(item.get('student_id'), item.get('section_id')) for item in data.get('assignments', [])]
         transfer_attendance = data.get('transfer_attendance', True)
         
-        updated_count = 0
-        
-        for item in assignments:
-            student_id = item.get('student_id')
-            new_section_id = item.get('section_id')
+        for start in range(0, len(assignments), SECTION_UPDATE_BATCH_SIZE):
+            batch = assignments[start:start + SECTION_UPDATE_BATCH_SIZE]
+            batch_updated = 0
+            reset_ids = []
             
-            student = Student.query.get(student_id)
-            if not student:
-                continue
+            # Lock this batch's students with one IN query, waiting on rows
+            # another transaction holds (SQLite ignores the locking clause)
+            students = {s.student_id: s for s in Student.query.filter(
+                Student.student_id.in_([student_id for student_id, _ in batch])
+            ).with_for_update()}
+            
+            for student_id, new_section_id in batch:
+                student = students.get(student_id)
+                if not student:
+                    continue
 
-            # Check if status or section is changing
-            current_section = student.section_id
-            current_active = (student.status == 'active')
-            
-            # Helper to determine new state
-            target_section = new_section_id
-            target_active = True
-            target_status = 'active'
-            
-            if new_section_id == 'left_college':
-                target_section = None
-                target_active = False
-                target_status = 'inactive'
-            elif new_section_id == 'none' or new_section_id is None:
-                target_section = None
-                target_active = True  # Unassigned but still active
+                # Check if status or section is changing
+                current_section = student.section_id
+                current_active = (student.status == 'active')
+                
+                # Helper to determine new state
+                target_section = new_section_id
+                target_active = True
                 target_status = 'active'
+                
+                if new_section_id == 'left_college':
+                    target_section = None
+                    target_active = False
+                    target_status = 'inactive'
+                elif new_section_id == 'none' or new_section_id is None:
+                    target_section = None
+                    target_active = True  # Unassigned but still active
+                    target_status = 'active'
+                
+                # Detect change
+                is_section_changed = (current_section != target_section)
+                is_status_changed = (current_active != target_active)
+                
+                if is_section_changed or is_status_changed:
+                    # If section changed (and active) AND NOT transferring, reset attendance
+                    # (We don't reset if just marking inactive, records should stay for history)
+                    if is_section_changed and target_active and not transfer_attendance:
+                        reset_ids.append(student_id)
+                    
+                    student.section_id = target_section
+                    student.status = target_status
+                    batch_updated += 1
             
-            # Detect change
-            is_section_changed = (current_section != target_section)
-            is_status_changed = (current_active != target_active)
+            # Soft-delete attendance for the batch's reset students in one UPDATE
+            if reset_ids:
+                AttendanceRecord.query.filter(
+                    AttendanceRecord.student_id.in_(reset_ids),
+                    AttendanceRecord.is_deleted == False
+                ).update({'is_deleted': True}, synchronize_session=False)
             
-            if is_section_changed or is_status_changed:
-                # If section changed (and active) AND NOT transferring, reset attendance
-                # (We don't reset if just marking inactive, records should stay for history)
-                if is_section_changed and target_active and not transfer_attendance:
-                     AttendanceRecord.query.filter_by(student_id=student_id, is_deleted=False).update({'is_deleted': True})
-                
-                student.section_id = target_section
-                student.status = target_status
-                updated_count += 1
+            db.session.commit()
+            invalidate(fee_access_cache)
+            if reset_ids:
+                invalidate(work_diary_cache)
+            updated_count += batch_updated
         
-        db.session.commit()
         return jsonify({'success': True, 'updated': updated_count})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'success': False, 'error': str(e)}), 400
+        # Earlier batches stay committed; report how far the update got
+        return jsonify({'success': False, 'error': str(e), 'updated': updated_count}), 400
 
 
 @app.route('/api/admin/students/enroll-subject', methods=['POST'])
@@ -3141,7 +3470,7 @@ def api_update_student_sections():
 def api_enroll_students_in_subject():
     """Enroll students in a specialization subject"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         student_ids = data.get('student_ids', [])
         subject_id = data.get('subject_id')
         academic_year = data.get('academic_year')
@@ -3150,28 +3479,31 @@ def api_enroll_students_in_subject():
         if not student_ids or not subject_id:
             return jsonify({'success': False, 'error': 'Missing student_ids or subject_id'}), 400
         
-        enrolled_count = 0
         errors = []
         
+        # Check which students are already enrolled with one IN query
+        enrolled_ids = {row.student_id for row in db.session.query(StudentSubjectEnrollment.student_id).filter_by(
+            subject_id=subject_id,
+            academic_year=academic_year
+        ).filter(StudentSubjectEnrollment.student_id.in_(student_ids))}
+        
+        new_enrollments = []
         for student_id in student_ids:
-            # Check if already enrolled
-            existing = StudentSubjectEnrollment.query.filter_by(
-                student_id=student_id,
-                subject_id=subject_id,
-                academic_year=academic_year
-            ).first()
-            
-            if not existing:
-                enrollment = StudentSubjectEnrollment(
-                    student_id=student_id,
-                    subject_id=subject_id,
-                    academic_year=academic_year,
-                    semester=semester
-                )
-                db.session.add(enrollment)
-                enrolled_count += 1
-            else:
+            if student_id in enrolled_ids:
                 errors.append(f"Student {student_id} already enrolled")
+                continue
+            new_enrollments.append({
+                'student_id': student_id,
+                'subject_id': subject_id,
+                'academic_year': academic_year,
+                'semester': semester
+            })
+            enrolled_ids.add(student_id)
+        
+        # Insert all new enrollments in one executemany
+        if new_enrollments:
+            db.session.execute(db.insert(StudentSubjectEnrollment), new_enrollments)
+        enrolled_count = len(new_enrollments)
         
         db.session.commit()
         return jsonify({
@@ -3187,16 +3519,23 @@ def api_enroll_students_in_subject():
 @app.route('/api/admin/students/unenroll-subject', methods=['POST'])
 @admin_required
 def api_unenroll_student_from_subject():
-    """Remove student enrollment from specialization subject"""
+    """Remove student enrollments from a specialization subject
+    Accepts a list of enrollment_ids, or a single enrollment_id"""
     try:
-        data = request.get_json()
-        enrollment_id = data.get('enrollment_id')
-        
-        enrollment = StudentSubjectEnrollment.query.get_or_404(enrollment_id)
-        enrollment.is_deleted = True
+        data = request.get_json(silent=True) or {}
+        enrollment_ids = data.get('enrollment_ids')
+        if enrollment_ids is None:
+            enrollment_ids = [data.get('enrollment_id')]
+        
+        # Soft delete every enrollment with one UPDATE
+        deleted = StudentSubjectEnrollment.query.filter(
+            StudentSubjectEnrollment.enrollment_id.in_(enrollment_ids)
+        ).update({'is_deleted': True}, synchronize_session=False)
+        if not deleted:
+            return jsonify({'success': False, 'error': 'Enrollment not found'}), 404
         db.session.commit()
         
-        return jsonify({'success': True})
+        return jsonify({'success': True, 'deleted': deleted})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 400
@@ -3206,6 +3545,45 @@ def api_unenroll_student_from_subject():
 # Bulk Import Routes (Admin Only)
 # ============================================
 
+# Imports run here, off the request thread; progress is tracked on the ImportLog row
+IMPORT_TYPES = ('student', 'faculty', 'subject', 'schedule')
+IMPORT_CHUNK_SIZE = 5000  # rows parsed, inserted and committed together
+# Student and faculty rows each hash a password (~0.1 s), so their chunks are
+# smaller to keep progress, and ImportLog.updated_at, moving every minute or so
+IMPORT_CHUNK_SIZES = {'student': 500, 'faculty': 500}
+# A 'processing' import with no progress for this long lost its worker
+# (process restart or deploy) and is reported as failed
+IMPORT_STALE_AFTER = timedelta(minutes=15)
+import_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bulk-import')
+
+
+def fail_stale_imports(import_id=None):
+    """
+    Mark imports whose worker has gone away as failed.
+    Jobs run in an in-process executor, so a restart drops them silently.
+    A 'processing' import is stale once it stops making progress. A 'queued'
+    one waits behind the import in progress, so it only counts as stale
+    while no import is making progress.
+    """
+    cutoff = datetime.utcnow() - IMPORT_STALE_AFTER
+    worker_busy = db.session.query(ImportLog.query.filter(
+        ImportLog.status == 'processing',
+        ImportLog.updated_at >= cutoff
+    ).exists()).scalar()
+    stale_statuses = ['processing'] if worker_busy else ['processing', 'queued']
+    
+    query = ImportLog.query.filter(
+        ImportLog.status.in_(stale_statuses),
+        ImportLog.updated_at < cutoff
+    )
+    if import_id:
+        query = query.filter(ImportLog.import_id == import_id)
+    if query.update({
+        'status': 'failed',
+        'error_log': 'Import stopped before finishing (server restarted?). Please upload the file again.'
+    }, synchronize_session=False):
+        db.session.commit()
+
 @app.route('/admin/import')
 @admin_required
 def admin_import():
@@ -3213,6 +3591,7 @@ def admin_import():
     Display bulk import interface for admin
     """
     try:
+        fail_stale_imports()
         recent_imports = ImportLog.query.order_by(ImportLog.created_at.desc()).limit(10).all()
     except Exception:
         # Handle case where old enum values exist in database
@@ -3226,9 +3605,6 @@ def download_import_template(import_type):
     """
     Download sample Excel template for import
     """
-    import os
-    from flask import send_file
-    
     template_files = {
         'student': 'students_template.csv',
         'faculty': 'faculty_template.csv',
@@ -3250,11 +3626,14 @@ def download_import_template(import_type):
     else:
         mimetype = 'text/csv'
     
+    # send_file answers If-None-Match/If-Modified-Since with 304 using its
+    # mtime/size ETag; templates only change with releases, so cache a day
     return send_file(
         template_path,
         as_attachment=True,
         download_name=template_files[import_type],
-        mimetype=mimetype
+        mimetype=mimetype,
+        max_age=86400
     )
 
 
@@ -3265,17 +3644,25 @@ def api_bulk_import():
     Handle bulk data import from CSV/Excel files
     Supports: students, faculty, subjects, schedules
     """
-    print("[IMPORT] Starting import request...")  # Debug
+    app.logger.debug("[IMPORT] Starting import request...")
     current_user = get_current_user()
     
+    # Reject oversized uploads from the header, before the form is read
+    max_size = app.config.get('MAX_CONTENT_LENGTH')
+    if max_size and request.content_length and request.content_length > max_size:
+        return jsonify({
+            'success': False,
+            'error': f'File too large. Maximum size is {max_size // (1024 * 1024)} MB'
+        }), 413
+    
     if 'file' not in request.files:
-        print("[IMPORT] No file in request")  # Debug
+        app.logger.debug("[IMPORT] No file in request")
         return jsonify({'success': False, 'error': 'No file uploaded'}), 400
     
     file = request.files['file']
     import_type = request.form.get('import_type')
     
-    print(f"[IMPORT] File: {file.filename}, Type: {import_type}")  # Debug
+    app.logger.debug("[IMPORT] File: %s, Type: %s", file.filename, import_type)
     
     if file.filename == '':
         return jsonify({'success': False, 'error': 'No file selected'}), 400
@@ -3290,32 +3677,133 @@ def api_bulk_import():
     if file_ext not in allowed_extensions:
         return jsonify({'success': False, 'error': 'Invalid file type. Use CSV or Excel'}), 400
     
+    if import_type not in IMPORT_TYPES:
+        return jsonify({'success': False, 'error': f'Unknown import type: {import_type}'}), 400
+    
+    file_path = None
     try:
-        # Read file data
-        import pandas as pd
-        print("[IMPORT] Reading file...")  # Debug
-        
-        if file_ext == '.csv':
-            df = pd.read_csv(file)
-        else:
-            df = pd.read_excel(file)
+        # Save the upload so the background worker can read it after this request ends
+        fd, file_path = tempfile.mkstemp(suffix=file_ext, prefix='import_')
+        with os.fdopen(fd, 'wb') as tmp:
+            file.save(tmp)
         
-        print(f"[IMPORT] File read. Rows: {len(df)}, Columns: {list(df.columns)}")  # Debug
+        import_log = ImportLog(
+            import_type=import_type,
+            imported_by=current_user.user_id,
+            file_name=file.filename,
+            status='queued'
+        )
+        db.session.add(import_log)
+        db.session.commit()
         
-        # Process import based on type
-        print("[IMPORT] Starting process_bulk_import...")  # Debug
-        result = process_bulk_import(df, import_type, current_user, file.filename)
-        print(f"[IMPORT] Completed: {result}")  # Debug
+        import_executor.submit(run_bulk_import, import_log.import_id, file_path, file_ext, import_type)
+        app.logger.debug("[IMPORT] Queued import %s", import_log.import_id)
         
-        return jsonify(result)
+        return jsonify({
+            'success': True,
+            'import_id': import_log.import_id,
+            'status': 'queued'
+        }), 202
     
     except Exception as e:
-        print(f"[IMPORT] ERROR: {str(e)}")  # Debug
-        import traceback
-        traceback.print_exc()
+        db.session.rollback()
+        app.logger.exception("[IMPORT] ERROR: %s", e)
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
         return jsonify({'success': False, 'error': f'Import failed: {str(e)}'}), 400
 
 
+@app.route('/api/admin/import/status/<import_id>')
+@admin_required
+def api_bulk_import_status(import_id):
+    """
+    Report progress of a queued bulk import
+    """
+    columns = (
+        ImportLog.import_id, ImportLog.status, ImportLog.total_rows,
+        ImportLog.successful_rows, ImportLog.failed_rows, ImportLog.error_log,
+        ImportLog.updated_at
+    )
+    import_log = ImportLog.query.with_entities(*columns).filter_by(import_id=import_id).first()
+    if not import_log:
+        return jsonify({'success': False, 'error': 'Import not found'}), 404
+    
+    # Re-read once the stale check has failed the import
+    if import_log.status in ('queued', 'processing') and import_log.updated_at < datetime.utcnow() - IMPORT_STALE_AFTER:
+        fail_stale_imports(import_id)
+        import_log = ImportLog.query.with_entities(*columns).filter_by(import_id=import_id).first()
+    
+    if import_log.status == 'failed':
+        return jsonify({
+            'success': False,
+            'import_id': import_log.import_id,
+            'status': import_log.status,
+            'error': f'Import failed: {import_log.error_log}'
+        })
+    
+    return jsonify({
+        'success': True,
+        'import_id': import_log.import_id,
+        'status': import_log.status,
+        'total': import_log.total_rows or 0,
+        'successful': import_log.successful_rows or 0,
+        'failed': import_log.failed_rows or 0,
+        'errors': import_log.error_log.split('\n')[:10] if import_log.error_log else []
+    })
+
+
+def run_bulk_import(import_id, file_path, file_ext, import_type):
+    """
+    Background job: parse the saved upload and import it, recording the
+    outcome on the ImportLog row. Always removes the temporary file.
+    """
+    with app.app_context():
+        try:
+            # Claim the job; skip it if the stale check already failed it
+            started = ImportLog.query.filter_by(import_id=import_id, status='queued').update(
+                {'status': 'processing'}, synchronize_session=False
+            )
+            db.session.commit()
+            if not started:
+                app.logger.warning("[IMPORT] Import %s is no longer queued; skipping", import_id)
+                return
+            
+            chunk_size = IMPORT_CHUNK_SIZES.get(import_type, IMPORT_CHUNK_SIZE)
+            result = process_bulk_import(read_import_chunks(file_path, file_ext, chunk_size), import_type, import_id)
+            app.logger.debug("[IMPORT] Completed: %s", result)
+        except Exception as e:
+            app.logger.exception("[IMPORT] Import %s failed", import_id)
+            # process_bulk_import marks its own failures; this is a fallback
+            db.session.rollback()
+            ImportLog.query.filter_by(import_id=import_id, status='processing').update(
+                {'status': 'failed', 'error_log': str(e)}, synchronize_session=False
+            )
+            db.session.commit()
+        finally:
+            db.session.remove()
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+
+def read_import_chunks(file_path, file_ext, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Yield the uploaded file as DataFrames of at most chunk_size rows,
+    keeping the row index continuous across chunks
+    """
+    import pandas as pd
+    
+    if file_ext == '.csv':
+        with pd.read_csv(file_path, chunksize=chunk_size) as reader:
+            yield from reader
+    else:
+        # Excel has no streaming reader, so slice the loaded sheet
+        df = pd.read_excel(file_path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size].copy()
+
+
 # ============================================
 # Database Initialization
 # ============================================
@@ -3346,13 +3834,12 @@ def create_default_roles():
         {'role_name': 'parent', 'description': 'Parent/Guardian'},
     ]
     
-    for role_data in default_roles:
-        existing_role = Role.query.filter_by(role_name=role_data['role_name']).first()
-        if not existing_role:
-            role = Role(**role_data)
-            db.session.add(role)
-    
     try:
+        # One SELECT for the existing names, one INSERT for whatever is missing
+        existing = {row.role_name for row in Role.query.with_entities(Role.role_name)}
+        missing = [role_data for role_data in default_roles if role_data['role_name'] not in existing]
+        if missing:
+            db.session.execute(db.insert(Role), missing)
         db.session.commit()
     except Exception as e:
         db.session.rollback()
@@ -3363,11 +3850,13 @@ def create_default_roles():
 # Work Diary Helper Functions
 # ============================================
 
-def auto_create_work_diary_from_attendance(attendance_session):
+def auto_create_work_diary_from_attendance(attendance_session, schedule=None):
     """
-    Automatically create work diary entry when attendance is taken
+    Automatically create work diary entry when attendance is taken.
+    Pass the session's schedule when the caller already has it loaded.
     """
-    schedule = attendance_session.schedule
+    if schedule is None:
+        schedule = attendance_session.schedule
     if not schedule:
         return None
     
@@ -3401,7 +3890,7 @@ def auto_create_work_diary_from_attendance(attendance_session):
         diary_number=diary_num,
         faculty_id=schedule.faculty_id,
         subject_id=schedule.subject_id,
-        section_id=schedule.section.section_id if schedule.section else None,
+        section_id=schedule.section_id,
         date=attendance_session.session_date or datetime.utcnow().date(),
         start_time=schedule.start_time,
         end_time=schedule.end_time,
@@ -3551,40 +4040,62 @@ def handle_work_diary_update(diary):
         return f"Error: {str(e)}", 400
 
 
-def process_bulk_import(df, import_type, current_user, filename):
+def process_bulk_import(chunks, import_type, import_id):
     """
-    Process bulk import data from DataFrame
+    Process bulk import data from an iterable of DataFrame chunks and record
+    the outcome on the ImportLog row identified by import_id
+    Each chunk is committed on its own, with progress written to the log
     Returns result dict with success/failure counts
     """
+    importers = {
+        'student': import_students,
+        'faculty': import_faculty,
+        'subject': import_subjects,
+        'schedule': import_schedules
+    }
+    total_rows = 0
     success_count = 0
     error_count = 0
     errors = []
     
     try:
-        # Process import based on type
-        if import_type == 'student':
-            success_count, error_count, errors = import_students(df)
-        elif import_type == 'faculty':
-            success_count, error_count, errors = import_faculty(df)
-        elif import_type == 'subject':
-            success_count, error_count, errors = import_subjects(df)
-        elif import_type == 'schedule':
-            success_count, error_count, errors = import_schedules(df)
-        else:
+        importer = importers.get(import_type)
+        if not importer:
             raise ValueError(f'Unknown import type: {import_type}')
         
-        # Create import log AFTER successful import
-        import_log = ImportLog(
-            import_type=import_type,
-            imported_by=current_user.user_id,
-            file_name=filename,
-            total_rows=len(df),
-            successful_rows=success_count,
-            failed_rows=error_count,
-            status='completed' if error_count == 0 else 'completed_with_errors',
-            error_log='\n'.join(errors[:50]) if errors else None
-        )
-        db.session.add(import_log)
+        for df in chunks:
+            # Publish progress before each chunk; this also keeps updated_at
+            # fresh for the stale check. Only a 'processing' row is updated,
+            # so if the stale check failed the import, stop before inserting more
+            still_running = ImportLog.query.filter_by(import_id=import_id, status='processing').update({
+                'total_rows': total_rows,
+                'successful_rows': success_count,
+                'failed_rows': error_count
+            }, synchronize_session=False)
+            db.session.commit()
+            if not still_running:
+                app.logger.warning("[IMPORT] Import %s was marked failed; stopping after %d rows", import_id, total_rows)
+                return {
+                    'success': False,
+                    'error': 'Import was marked failed before it finished',
+                    'successful': success_count,
+                    'failed': error_count
+                }
+            
+            chunk_success, chunk_errors, chunk_messages = importer(df)
+            total_rows += len(df)
+            success_count += chunk_success
+            error_count += chunk_errors
+            errors.extend(chunk_messages)
+        
+        # Update import log AFTER successful import, unless it was failed meanwhile
+        ImportLog.query.filter_by(import_id=import_id, status='processing').update({
+            'total_rows': total_rows,
+            'successful_rows': success_count,
+            'failed_rows': error_count,
+            'status': 'completed' if error_count == 0 else 'partial',
+            'error_log': '\n'.join(errors[:50]) if errors else None
+        }, synchronize_session=False)
         db.session.commit()
         
         return {
@@ -3597,17 +4108,13 @@ def process_bulk_import(df, import_type, current_user, filename):
     
     except Exception as e:
         db.session.rollback()
-        # Create failed import log
+        # Mark import log as failed
         try:
-            import_log = ImportLog(
-                import_type=import_type,
-                imported_by=current_user.user_id,
-                file_name=filename,
-                total_rows=len(df),
-                status='failed',
-                error_log=str(e)
-            )
-            db.session.add(import_log)
+            ImportLog.query.filter_by(import_id=import_id, status='processing').update({
+                'total_rows': total_rows,
+                'status': 'failed',
+                'error_log': str(e)
+            }, synchronize_session=False)
             db.session.commit()
         except:
             pass
@@ -3625,7 +4132,6 @@ def import_students(df):
     new format (name, usn)
     """
     import pandas as pd
-    from auth import hash_password
     
     success_count = 0
     error_count = 0
@@ -3662,30 +4168,57 @@ def import_students(df):
     
     
     total_rows = len(df)
-    print(f"[IMPORT] Starting to process {total_rows} students...")
-    
-    for idx, row in df.iterrows():
+    app.logger.debug("[IMPORT] Starting to process %d students...", total_rows)
+    
+    # Look up existing students, usernames, emails and programs for the whole chunk at once
+    roll_numbers = [str(value).strip() for value in df['roll_number']]
+    emails = [str(value).strip() for value in df['email']]
+    existing_rolls = {row.roll_number for row in Student.query.with_entities(Student.roll_number).filter(
+        Student.roll_number.in_(roll_numbers)
+    )}
+    existing_usernames = {row.username for row in User.query.with_entities(User.username).filter(
+        User.username.in_(roll_numbers)
+    )}
+    existing_emails = {row.email for row in User.query.with_entities(User.email).filter(
+        User.email.in_(emails)
+    )}
+    program_ids = {}
+    if 'program_code' in df.columns:
+        program_codes = {str(value).strip() for value in df['program_code'] if pd.notna(value)}
+        program_ids = dict(Program.query.with_entities(Program.program_code, Program.program_id).filter(
+            Program.program_code.in_(program_codes)
+        ).all())
+    
+    user_rows = []
+    student_rows = []
+    
+    # Plain dicts per row; iterrows builds a Series for every row
+    for idx, row in zip(df.index, df.to_dict('records')):
         # Progress logging every 50 rows
         if (idx + 1) % 50 == 0:
-            print(f"[IMPORT] Progress: {idx + 1}/{total_rows} rows processed...")
+            app.logger.debug("[IMPORT] Progress: %d/%d rows processed...", idx + 1, total_rows)
         
         try:
             roll_number = str(row['roll_number']).strip()
             
             # Check if student already exists
-            existing = Student.query.filter_by(roll_number=roll_number).first()
-            if existing:
+            if roll_number in existing_rolls:
                 errors.append(f"Row {idx+2}: Student {roll_number} already exists")
                 error_count += 1
                 continue
             
             # Check if username already exists
-            existing_user = User.query.filter_by(username=roll_number).first()
-            if existing_user:
+            if roll_number in existing_usernames:
                 errors.append(f"Row {idx+2}: Username {roll_number} already exists")
                 error_count += 1
                 continue
             
+            email = str(row['email']).strip()
+            if email in existing_emails:
+                errors.append(f"Row {idx+2}: Email {email} is already in use")
+                error_count += 1
+                continue
+            
             # Parse date of birth for password
             dob = row['date_of_birth']
             if pd.isna(dob):
@@ -3707,17 +4240,6 @@ def import_students(df):
             # Password = DDMMYYYY format
             password = dob.strftime('%d%m%Y')
             
-            # Create User account
-            user = User(
-                username=roll_number,
-                password_hash=hash_password(password),
-                email=str(row['email']).strip(),
-                role_id=student_role.role_id,
-                is_active=True
-            )
-            db.session.add(user)
-            db.session.flush()  # Get user_id
-            
             # Parse optional fields
             phone = row.get('phone', '')
             if pd.isna(phone):
@@ -3746,9 +4268,7 @@ def import_students(df):
             # Get program_id if provided
             program_id = None
             if 'program_code' in row and not pd.isna(row.get('program_code')):
-                program = Program.query.filter_by(program_code=str(row['program_code']).strip()).first()
-                if program:
-                    program_id = program.program_id
+                program_id = program_ids.get(str(row['program_code']).strip())
             
             # Get the full name from the 'name' column
             full_name = str(row.get('name', '')).strip() if pd.notna(row.get('name')) else ''
@@ -3757,24 +4277,37 @@ def import_students(df):
             if not full_name:
                 full_name = roll_number
             
-            # Create Student record
-            student = Student(
-                user_id=user.user_id,
-                roll_number=roll_number,
-                usn=roll_number,
-                name=full_name, # Use the combined/provided name
-                email=str(row['email']).strip(),
-                phone=phone,
-                date_of_birth=dob,
-                guardian_name=guardian_name,
-                guardian_phone=str(guardian_phone).strip() if guardian_phone else None,
-                address=address,
-                admission_year=admission_year,
-                program_id=program_id,
-                status='active',
-                gender=str(row.get('gender', '')).strip().upper()[:1] if pd.notna(row.get('gender')) else None  # M, F, or O
-            )
-            db.session.add(student)
+            # User account and Student record, inserted together after the loop
+            user_id = gen_uuid()
+            user_rows.append({
+                'user_id': user_id,
+                'username': roll_number,
+                'password_hash': hash_password(password),
+                'email': email,
+                'role_id': student_role.role_id,
+                'is_active': True
+            })
+            student_rows.append({
+                'user_id': user_id,
+                'roll_number': roll_number,
+                'usn': roll_number,
+                'name': full_name, # Use the combined/provided name
+                'email': email,
+                'phone': phone,
+                'date_of_birth': dob,
+                'guardian_name': guardian_name,
+                'guardian_phone': str(guardian_phone).strip() if guardian_phone else None,
+                'address': address,
+                'admission_year': admission_year,
+                'program_id': program_id,
+                'status': 'active',
+                'gender': str(row.get('gender', '')).strip().upper()[:1] if pd.notna(row.get('gender')) else None  # M, F, or O
+            })
+            
+            # Later rows in the same file must not reuse this student's keys
+            existing_rolls.add(roll_number)
+            existing_usernames.add(roll_number)
+            existing_emails.add(email)
             
             # NOTE: Parent accounts are no longer created separately
             # Parents now login using the same student credentials with "Parent" radio option
@@ -3782,17 +4315,19 @@ def import_students(df):
             success_count += 1
             
         except Exception as e:
-            print(f"[IMPORT ERROR] Row {idx+2}: {str(e)}")  # Debug logging
-            import traceback
-            traceback.print_exc()  # Print full stack trace
+            app.logger.debug("[IMPORT ERROR] Row %d: %s", idx + 2, e, exc_info=True)
             errors.append(f"Row {idx+2}: {str(e)}")
             error_count += 1
     
     # Log summary
-    print(f"[IMPORT COMPLETE] Success: {success_count}, Failed: {error_count}")
+    app.logger.debug("[IMPORT COMPLETE] Success: %d, Failed: %d", success_count, error_count)
     if errors:
-        print(f"[IMPORT ERRORS] {errors}")
+        app.logger.debug("[IMPORT ERRORS] %s", errors)
     
+    # Insert the whole chunk with two executemany statements
+    if user_rows:
+        db.session.execute(db.insert(User), user_rows)
+        db.session.execute(db.insert(Student), student_rows)
     db.session.commit()
     return success_count, error_count, errors
 
@@ -3800,7 +4335,6 @@ def import_students(df):
 def import_faculty(df):
     """Import faculty from DataFrame"""
     import pandas as pd
-    from auth import hash_password
     
     success_count = 0
     error_count = 0
@@ -3817,64 +4351,82 @@ def import_faculty(df):
     if not faculty_role:
         raise ValueError('Faculty role not found in database')
     
-    for idx, row in df.iterrows():
+    # Look up existing faculty, usernames and emails for the whole chunk at once
+    employee_ids = [str(value).strip() for value in df['employee_id']]
+    existing_employee_ids = {row.employee_id for row in Faculty.query.with_entities(Faculty.employee_id).filter(
+        Faculty.employee_id.in_(employee_ids)
+    )}
+    user_ids_by_username = dict(User.query.with_entities(User.username, User.user_id).filter(
+        User.username.in_(employee_ids)
+    ).all())
+    email_owners = {row.email: (row.user_id, row.username) for row in User.query.with_entities(
+        User.email, User.user_id, User.username
+    ).filter(User.email.in_([str(value).strip() for value in df['email']]))}
+    
+    for idx, row in zip(df.index, df.to_dict('records')):
         try:
             employee_id = str(row['employee_id']).strip()
             
             # Check if faculty already exists
-            existing = Faculty.query.filter_by(employee_id=employee_id).first()
-            if existing:
+            if employee_id in existing_employee_ids:
                 errors.append(f"Row {idx+2}: Faculty {employee_id} already exists")
                 error_count += 1
                 continue
             
             # Create User account first
             # Username = employee_id, Password = employee_id (default)
-            user = User.query.filter_by(username=employee_id).first()
+            user_id = user_ids_by_username.get(employee_id)
             
             # Check if email is already in use by a DIFFERENT user
             email = str(row['email']).strip()
-            existing_email_user = User.query.filter_by(email=email).first()
+            email_owner = email_owners.get(email)
             
-            if existing_email_user:
-                if user and existing_email_user.user_id != user.user_id:
+            if email_owner:
+                owner_id, owner_username = email_owner
+                if user_id and owner_id != user_id:
                      pass 
-                elif not user:
-                     errors.append(f"Row {idx+2}: Email {email} is already in use by user '{existing_email_user.username}'")
+                elif not user_id:
+                     errors.append(f"Row {idx+2}: Email {email} is already in use by user '{owner_username}'")
                      error_count += 1
                      continue
             
-            if not user:
-                user = User(
-                    username=employee_id,
-                    email=email,
-                    password_hash=hash_password(employee_id), # Default password is employee_id
-                    role_id=faculty_role.role_id,
-                    is_active=True
+            # Each row gets a SAVEPOINT, so a failing row rolls back only itself
+            with db.session.begin_nested():
+                if not user_id:
+                    user_id = gen_uuid()
+                    db.session.add(User(
+                        user_id=user_id,
+                        username=employee_id,
+                        email=email,
+                        password_hash=hash_password(employee_id), # Default password is employee_id
+                        role_id=faculty_role.role_id,
+                        is_active=True
+                    ))
+                
+                faculty = Faculty(
+                    employee_id=employee_id,
+                    user_id=user_id,
+                    first_name=row['first_name'],
+                    last_name=row['last_name'],
+                    email=row['email'],
+                    phone=row.get('phone') if pd.notna(row.get('phone')) else None,
+                    designation=row.get('designation') if pd.notna(row.get('designation')) else None,
+                    department=row.get('department') if pd.notna(row.get('department')) else None
                 )
-                db.session.add(user)
-                db.session.flush() # Flush to get user_id
-            
-            faculty = Faculty(
-                employee_id=employee_id,
-                user_id=user.user_id,
-                first_name=row['first_name'],
-                last_name=row['last_name'],
-                email=row['email'],
-                phone=row.get('phone') if pd.notna(row.get('phone')) else None,
-                designation=row.get('designation') if pd.notna(row.get('designation')) else None,
-                department=row.get('department') if pd.notna(row.get('department')) else None
-            )
-            db.session.add(faculty)
-            db.session.commit() # Commit each successful row immediately
+                db.session.add(faculty)
             success_count += 1
             
+            # Later rows in the same file see this row's faculty and user
+            existing_employee_ids.add(employee_id)
+            user_ids_by_username[employee_id] = user_id
+            email_owners.setdefault(email, (user_id, employee_id))
+            
         except Exception as e:
-            db.session.rollback() # Rollback transaction on any error to clean session
             errors.append(f"Row {idx+2}: {str(e)}")
             error_count += 1
     
-    # db.session.commit() # Removed final commit as we commit per row
+    # One commit for the whole chunk
+    db.session.commit()
     return success_count, error_count, errors
 
 
@@ -3892,10 +4444,16 @@ def import_subjects(df):
     if missing_cols:
         raise ValueError(f'Missing required columns: {", ".join(missing_cols)}')
     
+    # Look up existing subject codes for the whole chunk at once
+    existing_codes = {row.subject_code for row in Subject.query.with_entities(Subject.subject_code).filter(
+        Subject.subject_code.in_([str(value).strip() for value in df['subject_code']])
+    )}
+    subject_rows = []
+    
     for idx, row in df.iterrows():
         try:
-            existing = Subject.query.filter_by(subject_code=str(row['subject_code']).strip()).first()
-            if existing:
+            subject_code = str(row['subject_code']).strip()
+            if subject_code in existing_codes:
                 errors.append(f"Row {idx+2}: Subject {row['subject_code']} already exists")
                 error_count += 1
                 continue
@@ -3904,27 +4462,28 @@ def import_subjects(df):
             credits_val = row.get('credits', 4) if not pd.isna(row.get('credits', 4)) else 4
             subject_type_val = row.get('subject_type', 'theory') if not pd.isna(row.get('subject_type', 'theory')) else 'theory'
             
-            subject = Subject(
-                subject_code=str(row['subject_code']).strip(),
-                subject_name=str(row['subject_name']).strip(),
-                semester_id=int(row['semester']),  # Use semester_id field
-                credits=float(credits_val),
-                subject_type=str(subject_type_val).strip()
-            )
-            db.session.add(subject)
+            subject_rows.append({
+                'subject_code': subject_code,
+                'subject_name': str(row['subject_name']).strip(),
+                'semester_id': int(row['semester']),  # Use semester_id field
+                'credits': float(credits_val),
+                'subject_type': str(subject_type_val).strip()
+            })
+            existing_codes.add(subject_code)
             success_count += 1
             
         except Exception as e:
-            print(f"[IMPORT ERROR] Row {idx+2}: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            app.logger.debug("[IMPORT ERROR] Row %d: %s", idx + 2, e, exc_info=True)
             errors.append(f"Row {idx+2}: {str(e)}")
             error_count += 1
     
-    print(f"[IMPORT COMPLETE] Subjects - Success: {success_count}, Failed: {error_count}")
+    app.logger.debug("[IMPORT COMPLETE] Subjects - Success: %d, Failed: %d", success_count, error_count)
     if errors:
-        print(f"[IMPORT ERRORS] {errors}")
+        app.logger.debug("[IMPORT ERRORS] %s", errors)
     
+    # Insert the whole chunk with one executemany
+    if subject_rows:
+        db.session.execute(db.insert(Subject), subject_rows)
     db.session.commit()
     return success_count, error_count, errors
 
@@ -3941,25 +4500,33 @@ def import_schedules(df):
     if missing_cols:
         raise ValueError(f'Missing required columns: {", ".join(missing_cols)}')
     
-    for idx, row in df.iterrows():
+    # Look up every referenced subject and faculty for the whole chunk at once
+    subject_ids_by_code = dict(Subject.query.with_entities(Subject.subject_code, Subject.subject_id).filter(
+        Subject.subject_code.in_({str(value).strip() for value in df['subject_code']})
+    ).all())
+    faculty_ids_by_employee_id = dict(Faculty.query.with_entities(Faculty.employee_id, Faculty.faculty_id).filter(
+        Faculty.employee_id.in_({str(value).strip() for value in df['faculty_employee_id']})
+    ).all())
+    
+    for idx, row in zip(df.index, df.to_dict('records')):
         try:
             # Lookup subject and faculty
-            subject = Subject.query.filter_by(subject_code=row['subject_code']).first()
-            faculty = Faculty.query.filter_by(employee_id=row['faculty_employee_id']).first()
+            subject_id = subject_ids_by_code.get(str(row['subject_code']).strip())
+            faculty_id = faculty_ids_by_employee_id.get(str(row['faculty_employee_id']).strip())
             
-            if not subject:
+            if not subject_id:
                 errors.append(f"Row {idx+2}: Subject {row['subject_code']} not found")
                 error_count += 1
                 continue
             
-            if not faculty:
+            if not faculty_id:
                 errors.append(f"Row {idx+2}: Faculty {row['faculty_employee_id']} not found")
                 error_count += 1
                 continue
             
             schedule = ClassSchedule(
-                subject_id=subject.subject_id,
-                faculty_id=faculty.faculty_id,
+                subject_id=subject_id,
+                faculty_id=faculty_id,
                 day_of_week=row['day_of_week'],
                 start_time=row['start_time'],
                 end_time=row['end_time'],
@@ -4033,7 +4600,7 @@ def api_campus_checkin():
     current_user = get_current_user()
     
     # Verify user is a student
-    if not current_user.role or current_user.role.role_name.lower() != 'student':
+    if not current_user.role or current_user.role.role_key != 'student':
         return jsonify({'success': False, 'error': 'Only students can check in'}), 403
     
     # Get student record
@@ -4131,7 +4698,7 @@ def api_checkin_status():
     """
     current_user = get_current_user()
     
-    if not current_user.role or current_user.role.role_name.lower() != 'student':
+    if not current_user.role or current_user.role.role_key != 'student':
         return jsonify({'success': False, 'error': 'Only students can view check-in status'}), 403
     
     student = Student.query.filter_by(user_id=current_user.user_id, is_deleted=False).first()
@@ -4239,7 +4806,6 @@ def faculty_dashboard_view():
             
         except Exception as e:
             print(f"[DURATION ERROR] Failed to calculate duration for session {session.attendance_session_id}: {str(e)}")
-            import traceback
             traceback.print_exc()
             return 1.0  # Default to 1 hour if calculation fails
     
@@ -4282,7 +4848,6 @@ def faculty_dashboard_view():
     ).order_by(AttendanceSession.taken_at.desc()).limit(10).all()
     
     # 4. Check-in/Out Status
-    from models import FacultyAttendance
     attendance = FacultyAttendance.query.filter_by(
         faculty_id=faculty_record.faculty_id,
         date=today
@@ -4405,7 +4970,6 @@ def faculty_attendance_report():
             record = attendance_records[current_day]
             if record.check_in_time:
                 status = "Present"
-                from timezone_utils import format_ist_time
                 check_in = format_ist_time(record.check_in_time, '%H:%M')
             if record.check_out_time:
                 check_out = format_ist_time(record.check_out_time, '%H:%M')
@@ -4473,6 +5037,9 @@ def faculty_delete_attendance_session(session_id):
         AttendanceRecord.query.filter_by(attendance_session_id=session.attendance_session_id).update({'is_deleted': True})
         
         db.session.commit()
+        
+        # Cached work diaries may still list the deleted session
+        invalidate(work_diary_cache)
         return jsonify({'success': True})
     except Exception as e:
         db.session.rollback()
@@ -4649,7 +5216,6 @@ def faculty_profile():
     """
     Faculty Profile - View and Edit
     """
-    from werkzeug.security import generate_password_hash
     
     current_user = get_current_user()
     faculty_record = Faculty.query.filter_by(user_id=current_user.user_id).first()
@@ -4691,7 +5257,7 @@ def faculty_profile():
                     flash('Password must be at least 6 characters long', 'error')
                     return render_template('faculty/profile.html', faculty=faculty_record, user=current_user)
                 
-                current_user.password_hash = generate_password_hash(new_password)
+                current_user.password_hash = hash_password(new_password)
             
             db.session.commit()
             flash('Profile updated successfully!', 'success')
@@ -4911,7 +5477,6 @@ def api_submit_attendance():
             valid_student_ids.update([s.student_id for s in section.students.filter_by(is_deleted=False).all()])
         
         # Also include students enrolled in this subject (for electives/languages)
-        from models import StudentSubjectEnrollment
         enrolled_students = StudentSubjectEnrollment.query.filter_by(
             subject_id=subject_id,
             is_deleted=False
@@ -4921,7 +5486,7 @@ def api_submit_attendance():
         print(f"[ATTENDANCE] Valid students for this session: {len(valid_student_ids)}")
         
         # Create attendance records only for valid students
-        created_count = 0
+        record_rows = []
         skipped_count = 0
         
         for record in records:
@@ -4934,16 +5499,20 @@ def api_submit_attendance():
                 skipped_count += 1
                 continue
             
-            attendance_record = AttendanceRecord(
-                attendance_session_id=session_obj.attendance_session_id,
-                student_id=student_id,
-                status=status
-            )
-            db.session.add(attendance_record)
-            created_count += 1
+            record_rows.append({
+                'attendance_session_id': session_obj.attendance_session_id,
+                'student_id': student_id,
+                'status': status
+            })
+        
+        # Insert all records in one batched INSERT instead of one per student
+        if record_rows:
+            db.session.execute(db.insert(AttendanceRecord), record_rows)
+        created_count = len(record_rows)
         
         # Commit all changes
         db.session.commit()
+        invalidate(work_diary_cache)
         
         print(f"[ATTENDANCE] Success! Created {created_count} records, skipped {skipped_count}")
         
@@ -4961,7 +5530,6 @@ def api_submit_attendance():
         
     except Exception as e:
         db.session.rollback()
-        import traceback
         traceback.print_exc()
         print(f"[ATTENDANCE ERROR] {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -4997,7 +5565,6 @@ def api_get_subject_students(subject_id):
     Get all students enrolled in a subject (for elective subjects)
     """
     try:
-        from models import StudentSubjectEnrollment
         
         # Get students enrolled in this subject
         enrollments = StudentSubjectEnrollment.query.filter_by(
@@ -5164,7 +5731,7 @@ def monthly_attendance_report():
     ).all() if faculty else []
     
     # If admin/HOD, show all sections
-    if current_user.role and current_user.role.role_name.lower() in ['admin', 'hod']:
+    if current_user.role and current_user.role.role_key in ['admin', 'hod']:
         sections = Section.query.filter_by(is_deleted=False).all()
     
     return render_template('monthly_report.html',
@@ -5196,7 +5763,7 @@ def api_monthly_attendance_report():
         return jsonify({'success': False, 'error': 'Section not found'}), 404
     
     # Check if user has permission (class teacher, admin, or HOD)
-    is_admin = current_user.role and current_user.role.role_name.lower() in ['admin', 'hod']
+    is_admin = current_user.role and current_user.role.role_key in ['admin', 'hod']
     is_class_teacher = faculty and section.class_teacher_id == faculty.faculty_id
     
     if not is_admin and not is_class_teacher:
@@ -5350,7 +5917,6 @@ def calculate_distance(lat1, lon1, lat2, lon2):
 @faculty_required
 def api_faculty_checkin():
     """Faculty check-in (can be done from anywhere)"""
-    from models import FacultyAttendance
     
     current_user = get_current_user()
     faculty_record = Faculty.query.filter_by(user_id=current_user.user_id).first()
@@ -5402,7 +5968,6 @@ def api_faculty_checkin():
 @faculty_required
 def api_faculty_checkout():
     """Faculty check-out (must be at department location)"""
-    from models import FacultyAttendance, CollegeConfig
     
     current_user = get_current_user()
     faculty_record = Faculty.query.filter_by(user_id=current_user.user_id).first()
@@ -5479,7 +6044,6 @@ def api_faculty_checkout():
 @faculty_required
 def api_faculty_attendance_status():
     """Get today's check-in/out status"""
-    from models import FacultyAttendance
     
     current_user = get_current_user()
     faculty_record = Faculty.query.filter_by(user_id=current_user.user_id).first()
@@ -5516,7 +6080,6 @@ def api_faculty_student_analytics(student_id):
     print(f"=" * 80)
     
     try:
-        from models import Student, AttendanceRecord, AttendanceSession, ClassSchedule, Subject
         
         print(f"Step 1: Fetching student with ID: {student_id}")
         student = Student.query.get(student_id)
@@ -5528,7 +6091,6 @@ def api_faculty_student_analytics(student_id):
         print(f"Step 3: Student section_id: {student.section_id}")
         
         # Get the student's section to find the semester
-        from models import Section
         section = Section.query.get(student.section_id)
         if not section:
             return jsonify({'success': False, 'error': 'Section not found'}), 404
@@ -5644,7 +6206,6 @@ def api_faculty_student_analytics(student_id):
             'day_analysis': final_day_analysis
         })
     except Exception as e:
-        import traceback
         print(f"=" * 80)
         print(f"ANALYTICS ERROR:")
         print(f"Error Type: {type(e).__name__}")
@@ -5661,7 +6222,6 @@ def api_faculty_update_student(student_id):
     """
     Update student details (Phone, Address)
     """
-    from models import Student
     
     student = Student.query.get_or_404(student_id)
     data = request.get_json()
@@ -5754,7 +6314,6 @@ def student_dashboard():
     is_red_zone = overall_percentage < 75
     
     # Get random motivational quote
-    import random
     motivational_quote = random.choice(MOTIVATIONAL_QUOTES)
     
 
@@ -5976,7 +6535,6 @@ def api_student_analytics():
             'subject_stats': final_subject_stats
         })
     except Exception as e:
-        import traceback
         print(f"Analytics Error: {str(e)}")
         print(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 400
@@ -6123,16 +6681,8 @@ def api_student_checkin():
         
         # Verify location if config exists and has valid coordinates
         if config and config.campus_latitude and config.campus_longitude:
-            from math import radians, sin, cos, sqrt, atan2
-            
             # Calculate distance
-            R = 6371000  # Earth's radius in meters
-            lat1, lon1, lat2, lon2 = map(radians, [latitude, longitude, config.campus_latitude, config.campus_longitude])
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * atan2(sqrt(a), sqrt(1-a))
-            distance = R * c
+            distance = haversine_distance(latitude, longitude, config.campus_latitude, config.campus_longitude)
             
             radius = config.campus_radius_meters or 500  # Default 500m
             
@@ -6315,7 +6865,6 @@ def api_student_holidays():
     """
     Get upcoming and recent holidays
     """
-    from models import Holiday
     
     today = date.today()
     tomorrow = today + timedelta(days=1)
@@ -6383,7 +6932,6 @@ def api_student_motivational_quote():
     """
     Get a random motivational quote
     """
-    import random
     quote = random.choice(MOTIVATIONAL_QUOTES)
     
     return jsonify({
@@ -6453,8 +7001,6 @@ def api_student_update_profile():
 @student_required
 def student_fees_page():
     """Student fee management page"""
-    from models import Student, FeeStructure
-    import json
 
     current_user = get_current_user()
     student = Student.query.filter_by(user_id=current_user.user_id).first()
@@ -6480,14 +7026,13 @@ def student_fees_page():
         # Additional fees list
         if fee_structure.additional_fees:
             try:
-                fee_structure.additional_fees_list = json.loads(fee_structure.additional_fees)
+                fee_structure.additional_fees_list = parse_additional_fees(fee_structure.additional_fees)
             except:
                 fee_structure.additional_fees_list = []
         else:
             fee_structure.additional_fees_list = []
             
         # Fetch associated receipts
-        from models import FeeReceipt
         fee_structure.receipts = FeeReceipt.query.filter_by(
             fee_structure_id=fee_structure.fee_structure_id,
             is_deleted=False
@@ -6502,8 +7047,6 @@ def student_fees_page():
 @student_required
 def api_submit_fee_receipt():
     """Submit a fee receipt for verification"""
-    from models import Student, FeeStructure, FeeReceipt
-    import datetime
     
     current_user = get_current_user()
     student = Student.query.filter_by(user_id=current_user.user_id).first()
@@ -6531,7 +7074,7 @@ def api_submit_fee_receipt():
         if existing_receipt:
             return jsonify({'success': False, 'error': 'Receipt number already submitted'}), 400
             
-        payment_date = datetime.datetime.strptime(payment_date_str, '%Y-%m-%d').date()
+        payment_date = datetime.strptime(payment_date_str, '%Y-%m-%d').date()
         
         new_receipt = FeeReceipt(
             fee_structure_id=fee_structure_id,
@@ -6570,7 +7113,6 @@ def admin_holidays():
 @app.route('/api/admin/holidays', methods=['GET'])
 @admin_required
 def api_get_holidays():
-    from models import Holiday
     holidays = Holiday.query.order_by(Holiday.holiday_date).all()
     return jsonify({
         'success': True,
@@ -6605,9 +7147,6 @@ def api_save_holiday_settings():
 @app.route('/api/admin/holidays/auto-generate', methods=['POST'])
 @admin_required
 def api_auto_generate_holidays():
-    from models import Holiday, SystemSettings
-    from datetime import datetime, timedelta
-    
     try:
         start_setting = SystemSettings.query.get('academic_year_start')
         end_setting = SystemSettings.query.get('academic_year_end')
@@ -6670,8 +7209,6 @@ def api_auto_generate_holidays():
 @app.route('/api/admin/holidays', methods=['POST'])
 @admin_required
 def api_add_holiday():
-    from models import Holiday, SystemSettings
-    from datetime import datetime
     
     try:
         data = request.get_json()
@@ -6708,7 +7245,6 @@ def api_add_holiday():
 @app.route('/api/admin/holidays/<holiday_id>', methods=['DELETE'])
 @admin_required
 def api_delete_holiday(holiday_id):
-    from models import Holiday
     try:
         h = Holiday.query.get(holiday_id)
         if not h:
@@ -6743,9 +7279,6 @@ def admin_fees_page():
 @admin_required
 def admin_fee_templates():
     """List all fee templates grouped by batch year"""
-    from models import FeeTemplate
-    from sqlalchemy import desc
-    
     # Get all templates, ordered by batch year and academic year
     templates = FeeTemplate.query.filter_by(is_deleted=False).order_by(
         desc(FeeTemplate.batch_year),
@@ -6773,8 +7306,6 @@ def admin_fee_templates():
 @admin_required
 def admin_add_fee_template():
     """Add a new fee template"""
-    from models import FeeTemplate
-    
     if request.method == 'POST':
         try:
             academic_year = request.form.get('academic_year')
@@ -6835,8 +7366,6 @@ def admin_add_fee_template():
 @admin_required
 def admin_edit_fee_template(template_id):
     """Edit an existing fee template"""
-    from models import FeeTemplate
-    
     template = FeeTemplate.query.filter_by(fee_template_id=template_id, is_deleted=False).first()
     if not template:
         flash('Fee template not found', 'error')
@@ -6863,8 +7392,6 @@ def admin_edit_fee_template(template_id):
 @admin_required
 def admin_delete_fee_template(template_id):
     """Soft delete a fee template"""
-    from models import FeeTemplate
-    
     template = FeeTemplate.query.filter_by(fee_template_id=template_id, is_deleted=False).first()
     if not template:
         return jsonify({'success': False, 'message': 'Template not found'}), 404
@@ -6882,9 +7409,6 @@ def admin_delete_fee_template(template_id):
 @admin_required
 def admin_assign_fees():
     """Bulk assign fees to students without fee structures"""
-    from models import Student, FeeTemplate, FeeStructure
-    import uuid
-    
     if request.method == 'POST':
         try:
             # Get students without fee structures
@@ -6948,7 +7472,6 @@ def admin_assign_fees():
             return redirect(url_for('admin_assign_fees'))
     
     # GET request - show students without fees
-    from models import Student, FeeStructure
     
     students = Student.query.filter_by(is_deleted=False).all()
     students_without_fees = []
@@ -7024,7 +7547,6 @@ def parent_dashboard():
     has_checked_in = bool(checkin_today)
     
     # Motivational Quote (for parent context, maybe just a welcome)
-    import random
     quote = random.choice(MOTIVATIONAL_QUOTES)
 
     section = Section.query.get(student_record.section_id) if student_record.section_id else None
@@ -0,0 +1,51 @@
+"""
+Short-lived in-process caches for expensive page data
+Each cache is a TTLCache, so entries expire on their own; callers put enough
+in the key (e.g. latest session timestamp) that new data gets a new entry.
+Caches are per worker process, so keep TTLs short.
+"""
+
+from threading import Lock
+
+from cachetools import TTLCache
+
+# Work diary entries per (user_id, latest session taken_at)
+WORK_DIARY_CACHE_TTL = 60  # seconds
+work_diary_cache = TTLCache(maxsize=256, ttl=WORK_DIARY_CACHE_TTL)
+
+# Admin dashboard faculty/student/subject/section counts
+DASHBOARD_COUNTS_CACHE_TTL = 30  # seconds
+dashboard_counts_cache = TTLCache(maxsize=1, ttl=DASHBOARD_COUNTS_CACHE_TTL)
+
+# Fee breakdown access decisions per (user_id, student_id)
+FEE_ACCESS_CACHE_TTL = 60  # seconds
+fee_access_cache = TTLCache(maxsize=10000, ttl=FEE_ACCESS_CACHE_TTL)
+
+_cache_lock = Lock()
+
+
+def get_or_compute(cache, key, compute):
+    """
+    Return the cached value for key, computing and storing it on a miss.
+    compute() runs outside the lock, so two concurrent misses may both compute.
+    """
+    with _cache_lock:
+        if key in cache:
+            return cache[key]
+
+    value = compute()
+
+    with _cache_lock:
+        cache[key] = value
+    return value
+
+
+def invalidate(cache, key=None):
+    """
+    Drop one key from a cache, or clear it entirely when key is None
+    """
+    with _cache_lock:
+        if key is None:
+            cache.clear()
+        else:
+            cache.pop(key, None)
@@ -22,7 +22,21 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(os.path.abspath(os.path.dirname(__file__)), 'instance', 'attendance.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
+
+    # Connection pool: check connections before use and recycle them before
+    # the server drops idle ones. Keep pool size + overflow times the number
+    # of workers below the server's max_connections.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,  # seconds
+    }
+    if not SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        # SQLite uses its own pools, which don't take these arguments
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 40)),
+        })
+
     # Session Configuration
     SESSION_TYPE = 'filesystem'
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
@@ -6,6 +6,128 @@ Automatic fee assignment based on joining year, academic year, and seat type
 from models import db, Student, FeeTemplate, FeeStructure
 from datetime import datetime
 import json
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# Students per transaction in bulk_assign_fees
+FEE_SYNC_BATCH_SIZE = 10000
+
+
+def parse_additional_fees(value):
+    """
+    Return the additional_fees column value as a new list.
+    Older rows hold the list JSON-encoded as a string inside the JSON column.
+    A copy is returned so edits are picked up when the list is assigned back.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        return json.loads(value)
+    return list(value)
+
+
+def additional_fees_total(additional_fees):
+    """
+    Sum the amounts of a parsed additional_fees list.
+    Uses math.fsum so the total is exact however many fees are added.
+    """
+    return math.fsum(float(f.get('amount', 0)) for f in additional_fees)
+
+
+def apply_fee_template(fee_structure, template):
+    """
+    Point an existing fee structure at a template, keeping its additional fees
+    """
+    fee_structure.template_id = template.fee_template_id
+    fee_structure.base_fees = template.base_fees
+    
+    # Recalculate total (base + additional fees)
+    additional_total = 0
+    if fee_structure.additional_fees:
+        try:
+            additional_total = additional_fees_total(parse_additional_fees(fee_structure.additional_fees))
+        except:
+            pass
+    
+    fee_structure.total_fees = template.base_fees + additional_total
+    # Note: balance is a calculated property, not a database column
+    # It's automatically calculated as: total_fees - sum(approved receipts)
+
+
+def bulk_assign_fees(students, user_id=None, batch_size=FEE_SYNC_BATCH_SIZE):
+    """
+    Assign or update fee structures for many students.
+    Same template rules as assign_fee_to_student, but templates are loaded once
+    and students are processed in batches of batch_size: each batch loads its
+    existing structures in one query, inserts new ones in one executemany and
+    is committed on its own, so a full sync never holds one huge transaction.
+    
+    Returns:
+        int: Number of students whose fees were assigned or updated
+    """
+    # Plain tuples, so the per-batch commits don't expire and reload students
+    rows = [
+        (s.student_id, s.section_id, s.joining_academic_year,
+         s.current_academic_year, s.seat_type, s.quota_type)
+        for s in students
+        if s.joining_academic_year and s.current_academic_year and s.seat_type
+    ]
+    if not rows:
+        return 0
+    
+    templates = {}
+    for template in FeeTemplate.query.filter_by(is_deleted=False):
+        key = (template.batch_year, template.academic_year, template.seat_type, template.quota_type)
+        templates.setdefault(key, template)
+    
+    assigned = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        
+        existing_structures = {
+            (fs.student_id, fs.academic_year): fs
+            for fs in FeeStructure.query.filter(
+                FeeStructure.student_id.in_([row[0] for row in batch]),
+                FeeStructure.is_deleted == False
+            )
+        }
+        
+        new_rows = []
+        for student_id, section_id, joining_year, academic_year, seat_type, quota_type in batch:
+            key = (joining_year, academic_year, seat_type)
+            template = templates.get(key + (quota_type,))
+            if not template and seat_type == 'MANAGEMENT':
+                # Try without quota_type for management seats
+                template = templates.get(key + (None,))
+            if not template:
+                continue
+            
+            existing = existing_structures.get((student_id, academic_year))
+            if existing:
+                apply_fee_template(existing, template)
+            else:
+                new_rows.append({
+                    'student_id': student_id,
+                    'section_id': section_id,
+                    'template_id': template.fee_template_id,
+                    'academic_year': academic_year,
+                    'base_fees': template.base_fees,
+                    'total_fees': template.base_fees,
+                    'is_auto_generated': True,
+                    'set_by_user_id': user_id
+                })
+            assigned += 1
+        
+        if new_rows:
+            db.session.execute(db.insert(FeeStructure), new_rows)
+        db.session.commit()
+        logger.info("Fee sync: committed students %d-%d of %d",
+                    start + 1, start + len(batch), len(rows))
+    
+    return assigned
+
 
 def assign_fee_to_student(student_id, user_id=None):
     """
@@ -68,21 +190,7 @@ def assign_fee_to_student(student_id, user_id=None):
         
         if existing:
             # Update existing structure
-            existing.template_id = template.fee_template_id
-            existing.base_fees = template.base_fees
-            
-            # Recalculate total (base + additional fees)
-            additional_total = 0
-            if existing.additional_fees:
-                try:
-                    additional_fees_list = json.loads(existing.additional_fees)
-                    additional_total = sum(float(f.get('amount', 0)) for f in additional_fees_list)
-                except:
-                    pass
-            
-            existing.total_fees = template.base_fees + additional_total
-            # Note: balance is a calculated property, not a database column
-            # It's automatically calculated as: total_fees - sum(approved receipts)
+            apply_fee_template(existing, template)
             
             db.session.commit()
             
@@ -155,7 +263,7 @@ def add_additional_fee(student_id, academic_year, fee_name, amount, remarks=None
         additional_fees = []
         if fee_structure.additional_fees:
             try:
-                additional_fees = json.loads(fee_structure.additional_fees)
+                additional_fees = parse_additional_fees(fee_structure.additional_fees)
             except:
                 additional_fees = []
         
@@ -170,10 +278,10 @@ def add_additional_fee(student_id, academic_year, fee_name, amount, remarks=None
         additional_fees.append(new_fee)
         
         # Update fee structure
-        fee_structure.additional_fees = json.dumps(additional_fees)
+        fee_structure.additional_fees = additional_fees
         
         # Recalculate total
-        additional_total = sum(float(f['amount']) for f in additional_fees)
+        additional_total = additional_fees_total(additional_fees)
         fee_structure.total_fees = fee_structure.base_fees + additional_total
         # balance is a calculated property
         
@@ -220,7 +328,7 @@ def remove_additional_fee(student_id, academic_year, fee_index):
         additional_fees = []
         if fee_structure.additional_fees:
             try:
-                additional_fees = json.loads(fee_structure.additional_fees)
+                additional_fees = parse_additional_fees(fee_structure.additional_fees)
             except:
                 return {'success': False, 'error': 'Invalid additional fees data'}
         
@@ -231,10 +339,10 @@ def remove_additional_fee(student_id, academic_year, fee_index):
             return {'success': False, 'error': 'Invalid fee index'}
         
         # Update fee structure
-        fee_structure.additional_fees = json.dumps(additional_fees) if additional_fees else None
+        fee_structure.additional_fees = additional_fees if additional_fees else None
         
         # Recalculate total
-        additional_total = sum(float(f['amount']) for f in additional_fees)
+        additional_total = additional_fees_total(additional_fees)
         fee_structure.total_fees = fee_structure.base_fees + additional_total
         # Note: balance is automatically calculated as a property
         
@@ -288,7 +396,7 @@ def get_student_fee_breakdown(student_id, academic_year=None):
         additional_fees = []
         if fee_structure.additional_fees:
             try:
-                additional_fees = json.loads(fee_structure.additional_fees)
+                additional_fees = parse_additional_fees(fee_structure.additional_fees)
             except:
                 pass
         
@@ -309,7 +417,7 @@ def get_student_fee_breakdown(student_id, academic_year=None):
                 'academic_year': fee_structure.academic_year,
                 'base_fees': fee_structure.base_fees,
                 'additional_fees': additional_fees,
-                'additional_total': sum(float(f['amount']) for f in additional_fees),
+                'additional_total': additional_fees_total(additional_fees),
                 'total_fees': fee_structure.total_fees,
                 'amount_paid': fee_structure.amount_paid or 0,
                 'balance': fee_structure.balance or fee_structure.total_fees
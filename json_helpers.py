@@ -0,0 +1,39 @@
+"""
+JSON provider backed by orjson
+Installed as app.json so every jsonify() response, and request.get_json(),
+goes through orjson instead of the stdlib json module.
+"""
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider that serializes with orjson.
+    Keys are sorted and non-str keys allowed, like the stdlib provider; dates
+    and dataclasses are passed through to the same default() hook, so dates
+    keep Flask's HTTP date format.
+    """
+
+    options = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+               | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+    def dumps(self, obj, **kwargs):
+        # Pretty-printed (debug mode) or customised output stays on the stdlib encoder
+        if kwargs.get('indent') or 'default' in kwargs or 'cls' in kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Compact responses keep orjson's bytes rather than decoding to str
+        # for dumps() and re-encoding in the Response
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default,
+                            option=self.options | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
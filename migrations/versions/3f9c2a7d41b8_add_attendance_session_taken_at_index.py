@@ -0,0 +1,31 @@
+"""Add descending taken_at index on attendance_sessions
+
+Revision ID: 3f9c2a7d41b8
+Revises: 16519974a722
+Create Date: 2026-10-16 10:12:31.482117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d41b8'
+down_revision = '16519974a722'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Lets the admin attendance overview read the latest sessions with an
+    # index range scan instead of sorting the whole table.
+    op.create_index(
+        'ix_attendance_session_taken_at_desc',
+        'attendance_sessions',
+        [sa.text('taken_at DESC')],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_attendance_session_taken_at_desc', table_name='attendance_sessions')
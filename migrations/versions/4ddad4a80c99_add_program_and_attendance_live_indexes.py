@@ -0,0 +1,48 @@
+"""Add live-row indexes on program_id and attendance student_id
+
+Revision ID: 4ddad4a80c99
+Revises: cc7a017516dc
+Create Date: 2026-10-16 12:03:34.823633
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4ddad4a80c99'
+down_revision = 'cc7a017516dc'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) for each live-row index
+LIVE_ROW_INDEXES = [
+    ('ix_faculties_program_live', 'faculties', ['program_id']),
+    ('ix_sections_program_live', 'sections', ['program_id']),
+    ('ix_attendance_student_live', 'attendance_records', ['student_id']),
+]
+
+
+def upgrade():
+    # Serve the per-program faculty/section lookups and the attendance reset
+    # on section change, which all filter on is_deleted = false. Students are
+    # already covered by ix_students_eligibility. Built CONCURRENTLY on
+    # PostgreSQL, outside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in LIVE_ROW_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text('NOT is_deleted'),
+                sqlite_where=sa.text('NOT is_deleted'),
+                postgresql_concurrently=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _columns in reversed(LIVE_ROW_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,47 @@
+"""Add 'queued' to import_status_enum
+
+Revision ID: 6083f6bcf7fa
+Revises: 4ddad4a80c99
+Create Date: 2026-10-16 14:21:08.402715
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6083f6bcf7fa'
+down_revision = '4ddad4a80c99'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Imports waiting for the background worker are 'queued' until it picks
+    # them up. SQLite stores the enum as plain text, so only PostgreSQL and
+    # MySQL need the type changed.
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # ALTER TYPE ... ADD VALUE cannot run inside a transaction before PostgreSQL 12
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE import_status_enum ADD VALUE IF NOT EXISTS 'queued' BEFORE 'processing'")
+    elif dialect == 'mysql':
+        op.alter_column(
+            'import_logs', 'status',
+            existing_type=sa.Enum('processing', 'completed', 'failed', 'partial', name='import_status_enum'),
+            type_=sa.Enum('queued', 'processing', 'completed', 'failed', 'partial', name='import_status_enum'),
+            existing_nullable=False
+        )
+
+
+def downgrade():
+    # PostgreSQL cannot drop an enum value, so leave the type as it is and
+    # just move any waiting imports back to 'processing'
+    op.execute("UPDATE import_logs SET status = 'processing' WHERE status = 'queued'")
+    if op.get_bind().dialect.name == 'mysql':
+        op.alter_column(
+            'import_logs', 'status',
+            existing_type=sa.Enum('queued', 'processing', 'completed', 'failed', 'partial', name='import_status_enum'),
+            type_=sa.Enum('processing', 'completed', 'failed', 'partial', name='import_status_enum'),
+            existing_nullable=False
+        )
@@ -0,0 +1,58 @@
+"""Add mv_session_attendance_counts reporting view
+
+Revision ID: 8b1e4c6f2a90
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-16 11:02:47.915203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e4c6f2a90'
+down_revision = '3f9c2a7d41b8'
+branch_labels = None
+depends_on = None
+
+
+# Copy of models.SESSION_ATTENDANCE_COUNTS_SELECT as of this revision. Keep
+# it frozen here; a later change to the view needs its own migration.
+COUNTS_SELECT = """
+    SELECT r.attendance_session_id,
+           SUM(CASE WHEN r.status = 'present' THEN 1 ELSE 0 END) AS present_count,
+           SUM(CASE WHEN r.status = 'absent' THEN 1 ELSE 0 END) AS absent_count,
+           COUNT(*) AS total_count,
+           SUM(CASE WHEN r.status = 'present' AND e.enrolled = 1 THEN 1 ELSE 0 END) AS enrolled_present,
+           SUM(CASE WHEN e.enrolled = 1 THEN 1 ELSE 0 END) AS enrolled_total
+    FROM attendance_records r
+    JOIN attendance_sessions s ON s.attendance_session_id = r.attendance_session_id
+    JOIN class_schedules cs ON cs.schedule_id = s.schedule_id
+    LEFT JOIN (
+        SELECT DISTINCT student_id, subject_id, 1 AS enrolled
+        FROM student_subject_enrollments
+        WHERE NOT is_deleted
+    ) e ON e.student_id = r.student_id AND e.subject_id = cs.subject_id
+    WHERE NOT r.is_deleted
+    GROUP BY r.attendance_session_id
+"""
+
+
+def upgrade():
+    # Materialized on PostgreSQL (refreshed by scripts/refresh_session_attendance_counts.py),
+    # a plain view everywhere else.
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f"CREATE MATERIALIZED VIEW mv_session_attendance_counts AS {COUNTS_SELECT}")
+        op.execute(
+            "CREATE UNIQUE INDEX ix_mv_session_attendance_counts_session "
+            "ON mv_session_attendance_counts (attendance_session_id)"
+        )
+    else:
+        op.execute(f"CREATE VIEW mv_session_attendance_counts AS {COUNTS_SELECT}")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_session_attendance_counts")
+    else:
+        op.execute("DROP VIEW IF EXISTS mv_session_attendance_counts")
@@ -0,0 +1,70 @@
+"""Store fee_structures.additional_fees as JSON arrays (jsonb on PostgreSQL)
+
+Revision ID: a7d2e5c8b140
+Revises: f3c1a8e5d924
+Create Date: 2026-10-16 15:02:44.180937
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d2e5c8b140'
+down_revision = 'f3c1a8e5d924'
+branch_labels = None
+depends_on = None
+
+
+fee_structures = sa.table(
+    'fee_structures',
+    sa.column('fee_structure_id', sa.String),
+    sa.column('additional_fees', sa.JSON),
+)
+
+
+def _rewrite_additional_fees(convert):
+    """Apply convert() to every non-null additional_fees value it changes."""
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(fee_structures.c.fee_structure_id, fee_structures.c.additional_fees)
+        .where(fee_structures.c.additional_fees.isnot(None))
+    ).all()
+    updates = []
+    for fee_structure_id, value in rows:
+        new_value = convert(value)
+        if new_value is not value:
+            updates.append({'b_id': fee_structure_id, 'b_fees': new_value})
+    if updates:
+        bind.execute(
+            fee_structures.update()
+            .where(fee_structures.c.fee_structure_id == sa.bindparam('b_id'))
+            .values(additional_fees=sa.bindparam('b_fees')),
+            updates
+        )
+
+
+def upgrade():
+    # Rows were written as a JSON-encoded string inside the JSON column;
+    # unwrap them to the array itself
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "ALTER TABLE fee_structures ALTER COLUMN additional_fees TYPE jsonb USING "
+            "CASE WHEN json_typeof(additional_fees) = 'string' "
+            "THEN (additional_fees #>> '{}')::jsonb ELSE additional_fees::jsonb END"
+        )
+    else:
+        _rewrite_additional_fees(lambda value: json.loads(value) if isinstance(value, str) else value)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "ALTER TABLE fee_structures ALTER COLUMN additional_fees TYPE json USING "
+            "CASE WHEN jsonb_typeof(additional_fees) = 'array' "
+            "THEN to_json(additional_fees::text) ELSE additional_fees::json END"
+        )
+    else:
+        _rewrite_additional_fees(lambda value: json.dumps(value) if isinstance(value, list) else value)
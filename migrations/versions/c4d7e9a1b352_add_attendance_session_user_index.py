@@ -0,0 +1,29 @@
+"""Add (taken_by_user_id, schedule_id, taken_at) index on attendance_sessions
+
+Revision ID: c4d7e9a1b352
+Revises: 8b1e4c6f2a90
+Create Date: 2026-10-16 11:26:05.337461
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d7e9a1b352'
+down_revision = '8b1e4c6f2a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_attendance_session_user_schedule_taken_at',
+        'attendance_sessions',
+        ['taken_by_user_id', 'schedule_id', 'taken_at'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_attendance_session_user_schedule_taken_at', table_name='attendance_sessions')
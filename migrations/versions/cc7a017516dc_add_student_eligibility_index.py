@@ -0,0 +1,38 @@
+"""Add covering eligibility index on students
+
+Revision ID: cc7a017516dc
+Revises: a7d2e5c8b140
+Create Date: 2026-10-16 15:41:27.306518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cc7a017516dc'
+down_revision = 'a7d2e5c8b140'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves the eligible-student lookups in auto_enroll_subject and the
+    # enroll-students page. On PostgreSQL the INCLUDE columns make it an
+    # index-only scan; built CONCURRENTLY, outside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_students_eligibility',
+            'students',
+            ['program_id', 'current_semester', 'status'],
+            unique=False,
+            postgresql_include=['section_id', 'student_id'],
+            postgresql_where=sa.text('NOT is_deleted'),
+            sqlite_where=sa.text('NOT is_deleted'),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_students_eligibility', table_name='students', postgresql_concurrently=True)
@@ -0,0 +1,46 @@
+"""Add partial live-session index and (session, status) attendance record index
+
+Revision ID: d5a8f3b2c617
+Revises: c4d7e9a1b352
+Create Date: 2026-10-16 12:04:47.918230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8f3b2c617'
+down_revision = 'c4d7e9a1b352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built CONCURRENTLY on PostgreSQL so attendance can still be taken while
+    # the indexes are created; that needs to run outside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_attendance_session_user_taken_at_live',
+            'attendance_sessions',
+            ['taken_by_user_id', sa.text('taken_at DESC')],
+            unique=False,
+            postgresql_where=sa.text('NOT is_deleted'),
+            sqlite_where=sa.text('NOT is_deleted'),
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_attendance_record_session_status',
+            'attendance_records',
+            ['attendance_session_id', 'status'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_attendance_record_session_status', table_name='attendance_records',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_attendance_session_user_taken_at_live', table_name='attendance_sessions',
+                      postgresql_concurrently=True)
@@ -0,0 +1,50 @@
+"""Add v_work_diary_rows reporting view
+
+Revision ID: e2b6c9d4f813
+Revises: d5a8f3b2c617
+Create Date: 2026-10-16 12:31:09.604518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b6c9d4f813'
+down_revision = 'd5a8f3b2c617'
+branch_labels = None
+depends_on = None
+
+
+ROWS_SELECT = """
+    SELECT s.attendance_session_id,
+           s.schedule_id,
+           s.taken_by_user_id,
+           s.taken_at,
+           s.diary_number,
+           s.topic_taught,
+           cs.date AS class_date,
+           cs.start_time,
+           cs.end_time,
+           sub.subject_code,
+           sub.subject_name,
+           sub.subject_type,
+           sec.section_name,
+           sec.current_semester,
+           f.first_name AS faculty_first_name,
+           f.last_name AS faculty_last_name
+    FROM attendance_sessions s
+    LEFT JOIN class_schedules cs ON cs.schedule_id = s.schedule_id
+    LEFT JOIN subjects sub ON sub.subject_id = cs.subject_id
+    LEFT JOIN sections sec ON sec.section_id = cs.section_id
+    LEFT JOIN faculties f ON f.faculty_id = cs.faculty_id
+    WHERE NOT s.is_deleted
+"""
+
+
+def upgrade():
+    op.execute(f"CREATE VIEW v_work_diary_rows AS {ROWS_SELECT}")
+
+
+def downgrade():
+    op.execute("DROP VIEW IF EXISTS v_work_diary_rows")
@@ -0,0 +1,50 @@
+"""Add partial live-row indexes on soft-deleted tables
+
+Revision ID: f3c1a8e5d924
+Revises: e2b6c9d4f813
+Create Date: 2026-10-16 14:21:09.503612
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c1a8e5d924'
+down_revision = 'e2b6c9d4f813'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) for each live-row index
+LIVE_ROW_INDEXES = [
+    ('ix_faculties_live', 'faculties', ['faculty_id']),
+    ('ix_students_live', 'students', ['student_id']),
+    ('ix_programs_live', 'programs', ['program_id']),
+    ('ix_subjects_live', 'subjects', ['subject_id']),
+    ('ix_sections_live', 'sections', ['section_id']),
+    ('ix_subject_allocations_live', 'subject_allocations', ['faculty_id']),
+]
+
+
+def upgrade():
+    # Only rows with is_deleted = false are indexed, so the admin listings
+    # skip soft-deleted rows without scanning them. Built CONCURRENTLY on
+    # PostgreSQL, outside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in LIVE_ROW_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text('NOT is_deleted'),
+                sqlite_where=sa.text('NOT is_deleted'),
+                postgresql_concurrently=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _columns in reversed(LIVE_ROW_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
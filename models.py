@@ -13,7 +13,12 @@ import uuid
 from datetime import datetime
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Index, UniqueConstraint
+from sqlalchemy import (
+    DDL, Column, Date, DateTime, Index, Integer, MetaData, String, Table, Time, UniqueConstraint,
+    event, func, text
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import column_property
 
 db = SQLAlchemy()
 
@@ -43,6 +48,16 @@ class SoftDeleteMixin:
     is_deleted = db.Column(db.Boolean, nullable=False, default=False)
 
 
+def live_rows_index(table_name, *columns, name=None):
+    """
+    Partial index over rows that are not soft deleted.
+    Serves the filter_by(is_deleted=False) listings; other databases ignore the WHERE.
+    Pass name for a table's second live-row index.
+    """
+    return Index(name or f"ix_{table_name}_live", *columns,
+                 postgresql_where=text("NOT is_deleted"), sqlite_where=text("NOT is_deleted"))
+
+
 # ---------------------------------------------------------------------
 # Core Models - User Management & Authentication
 # ---------------------------------------------------------------------
@@ -56,6 +71,10 @@ class Role(db.Model, TimestampMixin):
     role_name = db.Column(db.String(64), nullable=False, unique=True, index=True)
     description = db.Column(db.Text)
 
+    # Lower-cased role name, computed by the database when the row is loaded.
+    # Use this for role checks instead of calling role_name.lower() per request.
+    role_key = column_property(func.lower(role_name))
+
     # Relationships
     users = db.relationship("User", back_populates="role", lazy="dynamic")
 
@@ -149,6 +168,11 @@ class Faculty(db.Model, TimestampMixin, SoftDeleteMixin):
     schedules = db.relationship("ClassSchedule", back_populates="faculty", lazy="dynamic")
     tests = db.relationship("Test", back_populates="faculty", lazy="dynamic")
 
+    __table_args__ = (
+        live_rows_index("faculties", "faculty_id"),
+        live_rows_index("faculties", "program_id", name="ix_faculties_program_live"),
+    )
+
     def to_dict(self):
         """Convert faculty object to dictionary for JSON responses"""
         return {
@@ -238,6 +262,10 @@ class Program(db.Model, TimestampMixin, SoftDeleteMixin):
     # Relationships
     sections = db.relationship("Section", back_populates="program", lazy="dynamic")
 
+    __table_args__ = (
+        live_rows_index("programs", "program_id"),
+    )
+
     def to_dict(self):
         """Convert program object to dictionary for JSON responses"""
         return {
@@ -286,6 +314,8 @@ class Section(db.Model, TimestampMixin, SoftDeleteMixin):
 
     __table_args__ = (
         UniqueConstraint("section_name", "program_id", "current_semester", "academic_year", name="uix_section_program_semester"),
+        live_rows_index("sections", "section_id"),
+        live_rows_index("sections", "program_id", name="ix_sections_program_live"),
     )
 
     def get_students(self):
@@ -370,6 +400,15 @@ class Student(db.Model, TimestampMixin, SoftDeleteMixin):
     attendance_records = db.relationship("AttendanceRecord", back_populates="student", lazy="dynamic", cascade="all, delete-orphan")
     test_results = db.relationship("TestResult", back_populates="student", lazy="dynamic", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        live_rows_index("students", "student_id"),
+        # Eligible students for a subject (program + semester + status), with
+        # the selected ids carried in the index on PostgreSQL
+        Index("ix_students_eligibility", "program_id", "current_semester", "status",
+              postgresql_include=["section_id", "student_id"],
+              postgresql_where=text("NOT is_deleted"), sqlite_where=text("NOT is_deleted")),
+    )
+
     def to_dict(self):
         """Convert student object to dictionary for JSON responses"""
         return {
@@ -465,6 +504,7 @@ class Subject(db.Model, TimestampMixin, SoftDeleteMixin):
 
     __table_args__ = (
         UniqueConstraint("subject_code", name="uix_subject_code"),
+        live_rows_index("subjects", "subject_id"),
     )
 
     def to_dict(self):
@@ -606,6 +646,7 @@ class SubjectAllocation(db.Model, TimestampMixin, SoftDeleteMixin):
 
     __table_args__ = (
         UniqueConstraint("subject_id", "faculty_id", "section_id", name="uix_sub_fac_sec"),
+        live_rows_index("subject_allocations", "faculty_id"),
     )
 
     def to_dict(self):
@@ -714,6 +755,16 @@ class AttendanceSession(db.Model, TimestampMixin, SoftDeleteMixin):
     records = db.relationship("AttendanceRecord", back_populates="attendance_session", 
                             lazy="dynamic", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Serves "most recent sessions" listings (ORDER BY taken_at DESC LIMIT n)
+        Index("ix_attendance_session_taken_at_desc", taken_at.desc()),
+        # Serves per-faculty session lookups (work diary and DOCX export)
+        Index("ix_attendance_session_user_schedule_taken_at", "taken_by_user_id", "schedule_id", "taken_at"),
+        # Serves a faculty's latest live sessions; partial so deleted rows stay out of it
+        Index("ix_attendance_session_user_taken_at_live", "taken_by_user_id", taken_at.desc(),
+              postgresql_where=text("NOT is_deleted"), sqlite_where=text("NOT is_deleted")),
+    )
+
     @staticmethod
     def generate_diary_number(program_code=None):
         """
@@ -806,6 +857,10 @@ class AttendanceRecord(db.Model, TimestampMixin, SoftDeleteMixin):
     __table_args__ = (
         UniqueConstraint("attendance_session_id", "student_id", name="uix_session_student"),
         Index("ix_attendance_student_date", "student_id", "attendance_session_id"),
+        # Lets per-session present/total counts (GROUP BY session, status) read only the index
+        Index("ix_attendance_record_session_status", "attendance_session_id", "status"),
+        # Live records of a student, for the attendance reset on section change
+        live_rows_index("attendance_records", "student_id", name="ix_attendance_student_live"),
     )
 
     def to_dict(self):
@@ -822,6 +877,169 @@ class AttendanceRecord(db.Model, TimestampMixin, SoftDeleteMixin):
         return f"<AttendanceRecord student={self.student_id} status={self.status}>"
 
 
+# ---------------------------------------------------------------------
+# Per-Session Attendance Counts (reporting view)
+# ---------------------------------------------------------------------
+# Present/absent/total counts per attendance session, used by the work diary
+# pages instead of aggregating attendance_records on every page load.
+# enrolled_* only count students enrolled in the session's subject
+# (used for specialization/elective subjects).
+#
+# On PostgreSQL this is a materialized view, refreshed periodically by
+# scripts/refresh_session_attendance_counts.py. Other databases get a plain
+# view. The table is kept out of db.metadata so create_all() never tries to
+# create it as a real table; the view itself is created by the DDL hooks below.
+#
+# Staleness on PostgreSQL: sessions taken since the last refresh are not in
+# the view yet, and build_work_diary_entries counts those live. A session
+# that is already in the view keeps the counts from the last refresh until
+# the next one (up to the cron interval, 5 minutes by default), even if its
+# records change in the meantime: attendance edits, or the attendance reset
+# when a student changes section.
+SESSION_ATTENDANCE_COUNTS_VIEW = "mv_session_attendance_counts"
+
+# Copied verbatim into migrations/versions/8b1e4c6f2a90_add_session_attendance_counts_view.py
+# (migrations must not import models). Change both, and add a migration that
+# recreates the view.
+SESSION_ATTENDANCE_COUNTS_SELECT = """
+    SELECT r.attendance_session_id,
+           SUM(CASE WHEN r.status = 'present' THEN 1 ELSE 0 END) AS present_count,
+           SUM(CASE WHEN r.status = 'absent' THEN 1 ELSE 0 END) AS absent_count,
+           COUNT(*) AS total_count,
+           SUM(CASE WHEN r.status = 'present' AND e.enrolled = 1 THEN 1 ELSE 0 END) AS enrolled_present,
+           SUM(CASE WHEN e.enrolled = 1 THEN 1 ELSE 0 END) AS enrolled_total
+    FROM attendance_records r
+    JOIN attendance_sessions s ON s.attendance_session_id = r.attendance_session_id
+    JOIN class_schedules cs ON cs.schedule_id = s.schedule_id
+    LEFT JOIN (
+        SELECT DISTINCT student_id, subject_id, 1 AS enrolled
+        FROM student_subject_enrollments
+        WHERE NOT is_deleted
+    ) e ON e.student_id = r.student_id AND e.subject_id = cs.subject_id
+    WHERE NOT r.is_deleted
+    GROUP BY r.attendance_session_id
+"""
+
+session_attendance_counts = Table(
+    SESSION_ATTENDANCE_COUNTS_VIEW, MetaData(),
+    Column("attendance_session_id", String(36), primary_key=True),
+    Column("present_count", Integer),
+    Column("absent_count", Integer),
+    Column("total_count", Integer),
+    Column("enrolled_present", Integer),
+    Column("enrolled_total", Integer),
+)
+
+
+def _is_postgresql(ddl, target, bind, **kw):
+    return bind.dialect.name == "postgresql"
+
+
+def _is_sqlite(ddl, target, bind, **kw):
+    return bind.dialect.name == "sqlite"
+
+
+def _is_other_dialect(ddl, target, bind, **kw):
+    return bind.dialect.name not in ("postgresql", "sqlite")
+
+
+event.listen(db.metadata, "after_create", DDL(
+    f"CREATE MATERIALIZED VIEW IF NOT EXISTS {SESSION_ATTENDANCE_COUNTS_VIEW} AS {SESSION_ATTENDANCE_COUNTS_SELECT}"
+).execute_if(callable_=_is_postgresql))
+event.listen(db.metadata, "after_create", DDL(
+    f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{SESSION_ATTENDANCE_COUNTS_VIEW}_session "
+    f"ON {SESSION_ATTENDANCE_COUNTS_VIEW} (attendance_session_id)"
+).execute_if(callable_=_is_postgresql))
+event.listen(db.metadata, "after_create", DDL(
+    f"CREATE VIEW IF NOT EXISTS {SESSION_ATTENDANCE_COUNTS_VIEW} AS {SESSION_ATTENDANCE_COUNTS_SELECT}"
+).execute_if(callable_=_is_sqlite))
+event.listen(db.metadata, "after_create", DDL(
+    f"CREATE OR REPLACE VIEW {SESSION_ATTENDANCE_COUNTS_VIEW} AS {SESSION_ATTENDANCE_COUNTS_SELECT}"
+).execute_if(callable_=_is_other_dialect))
+event.listen(db.metadata, "before_drop", DDL(
+    f"DROP MATERIALIZED VIEW IF EXISTS {SESSION_ATTENDANCE_COUNTS_VIEW}"
+).execute_if(callable_=_is_postgresql))
+event.listen(db.metadata, "before_drop", DDL(
+    f"DROP VIEW IF EXISTS {SESSION_ATTENDANCE_COUNTS_VIEW}"
+).execute_if(callable_=lambda ddl, target, bind, **kw: not _is_postgresql(ddl, target, bind)))
+
+
+def refresh_session_attendance_counts():
+    """
+    Refresh the materialized per-session attendance counts.
+    Only needed on PostgreSQL; plain views on other databases are always current.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return
+    db.session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {SESSION_ATTENDANCE_COUNTS_VIEW}"))
+    db.session.commit()
+
+
+# ---------------------------------------------------------------------
+# Work Diary Rows (reporting view)
+# ---------------------------------------------------------------------
+# One flat row per live attendance session with the schedule, subject,
+# section and scheduled faculty columns the work diary DOCX export needs,
+# so the export is a single SELECT with no ORM objects to build.
+# Kept out of db.metadata for the same reason as the counts view above.
+WORK_DIARY_ROWS_VIEW = "v_work_diary_rows"
+
+WORK_DIARY_ROWS_SELECT = """
+    SELECT s.attendance_session_id,
+           s.schedule_id,
+           s.taken_by_user_id,
+           s.taken_at,
+           s.diary_number,
+           s.topic_taught,
+           cs.date AS class_date,
+           cs.start_time,
+           cs.end_time,
+           sub.subject_code,
+           sub.subject_name,
+           sub.subject_type,
+           sec.section_name,
+           sec.current_semester,
+           f.first_name AS faculty_first_name,
+           f.last_name AS faculty_last_name
+    FROM attendance_sessions s
+    LEFT JOIN class_schedules cs ON cs.schedule_id = s.schedule_id
+    LEFT JOIN subjects sub ON sub.subject_id = cs.subject_id
+    LEFT JOIN sections sec ON sec.section_id = cs.section_id
+    LEFT JOIN faculties f ON f.faculty_id = cs.faculty_id
+    WHERE NOT s.is_deleted
+"""
+
+work_diary_rows = Table(
+    WORK_DIARY_ROWS_VIEW, MetaData(),
+    Column("attendance_session_id", String(36), primary_key=True),
+    Column("schedule_id", String(36)),
+    Column("taken_by_user_id", String(36)),
+    Column("taken_at", DateTime),
+    Column("diary_number", String(20)),
+    Column("topic_taught", String(255)),
+    Column("class_date", Date),
+    Column("start_time", Time),
+    Column("end_time", Time),
+    Column("subject_code", String(64)),
+    Column("subject_name", String(255)),
+    Column("subject_type", String(64)),
+    Column("section_name", String(64)),
+    Column("current_semester", Integer),
+    Column("faculty_first_name", String(100)),
+    Column("faculty_last_name", String(100)),
+)
+
+event.listen(db.metadata, "after_create", DDL(
+    f"CREATE VIEW IF NOT EXISTS {WORK_DIARY_ROWS_VIEW} AS {WORK_DIARY_ROWS_SELECT}"
+).execute_if(callable_=_is_sqlite))
+event.listen(db.metadata, "after_create", DDL(
+    f"CREATE OR REPLACE VIEW {WORK_DIARY_ROWS_VIEW} AS {WORK_DIARY_ROWS_SELECT}"
+).execute_if(callable_=lambda ddl, target, bind, **kw: not _is_sqlite(ddl, target, bind)))
+event.listen(db.metadata, "before_drop", DDL(
+    f"DROP VIEW IF EXISTS {WORK_DIARY_ROWS_VIEW}"
+))
+
+
 # ---------------------------------------------------------------------
 # Assessment/Test Management Models
 # ---------------------------------------------------------------------
@@ -1074,7 +1292,7 @@ class ImportLog(db.Model, TimestampMixin):
     successful_rows = db.Column(db.Integer, default=0)
     failed_rows = db.Column(db.Integer, default=0)
     status = db.Column(
-        db.Enum("processing", "completed", "failed", "partial", name="import_status_enum"),
+        db.Enum("queued", "processing", "completed", "failed", "partial", name="import_status_enum"),
         nullable=False, default="processing"
     )
     error_log = db.Column(db.Text)  # JSON string of errors
@@ -1439,7 +1657,7 @@ class FeeStructure(db.Model, TimestampMixin, SoftDeleteMixin):
     total_fees = db.Column(db.Float, nullable=False)  # Total to be paid
     
     # Additional fees (new system)
-    additional_fees = db.Column(db.JSON, nullable=True)  # Array of {description, amount}
+    additional_fees = db.Column(db.JSON().with_variant(JSONB, "postgresql"), nullable=True)  # Array of {description, amount}
     
     # Auto-generation tracking
     is_auto_generated = db.Column(db.Boolean, default=False)  # True if created automatically from template
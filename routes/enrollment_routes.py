@@ -13,6 +13,7 @@ def admin_enrollment_page():
 from flask import Blueprint, render_template, request, jsonify, current_app
 from models import db, Student, Subject, Section, Program, StudentSubjectEnrollment
 from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
 import uuid
 from auth import admin_required, login_required
 
@@ -232,7 +233,8 @@ def admin_subject_enrollment_page(subject_id):
     
     # 1. Fetch Students eligible for this subject's semester/program
     # Logic: Students in the same Program + Semester
-    query = Student.query.join(Section).filter(
+    # The template shows each student's section, which the join already loads
+    query = Student.query.join(Section).options(contains_eager(Student.section)).filter(
         Section.program_id == subject.program_id,
         Section.current_semester == subject.semester_id,
         Student.is_deleted == False
@@ -247,16 +249,17 @@ def admin_subject_enrollment_page(subject_id):
         # academic_year? We should probably match current section's AY
     ).all()
     
-    enrolled_student_ids = {e.student_id for e in existing_enrollments}
+    enrollments_by_student = {}
+    for e in existing_enrollments:
+        enrollments_by_student.setdefault(e.student_id, e)
     
     # 3. Partition students
     available_students = []
     enrolled_students = []
     
     for student in all_students:
-        if student.student_id in enrolled_student_ids:
-            # Find the enrollment record
-            enrollment = next(e for e in existing_enrollments if e.student_id == student.student_id)
+        enrollment = enrollments_by_student.get(student.student_id)
+        if enrollment:
             enrolled_students.append({
                 'student': student,
                 'enrollment': enrollment
@@ -319,27 +322,26 @@ def add_enrollments_bulk():
             db.session.flush()
             
         # 2. Create Enrollments
-        count = 0
-        for stud_id in student_ids:
-            # Check exist
-            existing = StudentSubjectEnrollment.query.filter_by(
-                student_id=stud_id, subject_id=subject_id
-            ).first()
-            
-            if not existing:
-                enroll = StudentSubjectEnrollment(
-                    enrollment_id=str(uuid.uuid4()),
-                    student_id=stud_id,
-                    subject_id=subject_id,
-                    section_id=virtual_section.section_id,
-                    academic_year=academic_year,
-                    semester=subject.semester_id
-                )
-                db.session.add(enroll)
-                count += 1
+        # Already enrolled students are found in one query and the rest are
+        # inserted in one executemany
+        already_enrolled = {row.student_id for row in StudentSubjectEnrollment.query.filter(
+            StudentSubjectEnrollment.subject_id == subject_id,
+            StudentSubjectEnrollment.student_id.in_(student_ids)
+        ).with_entities(StudentSubjectEnrollment.student_id)}
+        
+        enrollments = [{
+            'enrollment_id': str(uuid.uuid4()),
+            'student_id': stud_id,
+            'subject_id': subject_id,
+            'section_id': virtual_section.section_id,
+            'academic_year': academic_year,
+            'semester': subject.semester_id
+        } for stud_id in dict.fromkeys(student_ids) if stud_id not in already_enrolled]
+        if enrollments:
+            db.session.execute(db.insert(StudentSubjectEnrollment), enrollments)
                 
         db.session.commit()
-        return jsonify({'success': True, 'enrolled_count': count})
+        return jsonify({'success': True, 'enrolled_count': len(enrollments)})
         
     except Exception as e:
         db.session.rollback()
@@ -0,0 +1,23 @@
+"""
+Refresh the per-session attendance counts used by the work diary pages.
+
+On PostgreSQL, mv_session_attendance_counts is a materialized view and must be
+refreshed periodically. Run this from cron, e.g. every 5 minutes:
+
+    */5 * * * * cd /path/to/app && python scripts/refresh_session_attendance_counts.py
+
+On other databases the counts are a plain view and this script does nothing.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from models import refresh_session_attendance_counts
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        refresh_session_attendance_counts()
+        print("✓ Session attendance counts refreshed")
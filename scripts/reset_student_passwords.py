@@ -38,7 +38,7 @@ for student_id, roll_number, dob, user_id, username in students:
         new_password = dob_date.strftime('%d%m%Y')
         
         # Hash password
-        password_hash = generate_password_hash(new_password, method='pbkdf2:sha256')
+        password_hash = generate_password_hash(new_password, method='scrypt')
         
         # Update user
         cursor.execute("""
@@ -68,7 +68,7 @@ for student_id, roll_number, dob, user_id, current_username in students:
         print(f"WARN: No DOB for {roll_number}, using default password: {password}")
     
     # Hash the password
-    password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+    password_hash = generate_password_hash(password, method='scrypt')
     
     # Update username to roll_number and password
     cursor.execute("""
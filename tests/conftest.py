@@ -1,7 +1,14 @@
 """
 Test configuration and fixtures for BCA BUB Attendance System
 """
+import os
+
 import pytest
+
+# The engine is created when app is imported, so the test database has to be
+# chosen before that; updating the config in the fixture comes too late
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
 from app import app as flask_app
 from models import db
 
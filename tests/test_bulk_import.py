@@ -0,0 +1,253 @@
+"""
+Test cases for the background bulk import flow
+Run with: pytest tests/test_bulk_import.py
+"""
+import os
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import pytest
+
+import app as app_module
+from models import db, ImportLog
+
+
+SUBJECTS_CSV = b"subject_code,subject_name,semester\nCS101,Programming in C,1\nCS102,Data Structures,2\n"
+
+
+class InlineExecutor:
+    """Runs submitted jobs immediately so tests can check the finished import"""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class RecordingExecutor:
+    """Records submitted jobs without running them"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+
+
+@pytest.fixture
+def admin_client(client, app):
+    """Test client logged in as an admin user"""
+    from models import User, Role
+
+    role = Role(role_name="admin", description="Administrator")
+    db.session.add(role)
+    db.session.commit()
+    user = User(username="admin", email="admin@test.com",
+                password_hash="hashed_password", role_id=role.role_id)
+    db.session.add(user)
+    db.session.commit()
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+        sess['role'] = 'admin'
+        sess['is_authenticated'] = True
+    return client
+
+
+def upload(client, content, import_type='subject', filename='subjects.csv'):
+    """Post a file to the bulk import endpoint"""
+    return client.post('/api/admin/import', data={
+        'file': (BytesIO(content), filename),
+        'import_type': import_type
+    }, content_type='multipart/form-data')
+
+
+class TestBulkImportQueue:
+    """Test queuing an import"""
+
+    def test_upload_returns_202_with_import_id(self, admin_client, monkeypatch):
+        """The upload is saved and queued, and the log starts as queued"""
+        executor = RecordingExecutor()
+        monkeypatch.setattr(app_module, 'import_executor', executor)
+
+        response = upload(admin_client, SUBJECTS_CSV)
+
+        assert response.status_code == 202
+        data = response.get_json()
+        assert data['success'] is True
+        assert data['status'] == 'queued'
+        assert db.session.get(ImportLog, data['import_id']).status == 'queued'
+
+        assert len(executor.jobs) == 1
+        fn, (import_id, file_path, file_ext, import_type) = executor.jobs[0]
+        assert fn is app_module.run_bulk_import
+        assert (import_id, file_ext, import_type) == (data['import_id'], '.csv', 'subject')
+        os.remove(file_path)
+
+    def test_upload_removed_when_log_cannot_be_created(self, admin_client, monkeypatch):
+        """The saved upload is deleted if the import cannot be queued"""
+        import tempfile
+
+        saved = []
+        real_mkstemp = tempfile.mkstemp
+
+        def mkstemp(**kwargs):
+            fd, path = real_mkstemp(**kwargs)
+            saved.append(path)
+            return fd, path
+
+        def broken_import_log(**kwargs):
+            raise RuntimeError('database unavailable')
+
+        monkeypatch.setattr(app_module.tempfile, 'mkstemp', mkstemp)
+        monkeypatch.setattr(app_module, 'ImportLog', broken_import_log)
+
+        response = upload(admin_client, SUBJECTS_CSV)
+
+        assert response.status_code == 400
+        assert len(saved) == 1
+        assert not os.path.exists(saved[0])
+
+    def test_unknown_import_type_is_rejected(self, admin_client, monkeypatch):
+        """Invalid import types are rejected before anything is queued"""
+        executor = RecordingExecutor()
+        monkeypatch.setattr(app_module, 'import_executor', executor)
+
+        response = upload(admin_client, SUBJECTS_CSV, import_type='nonsense')
+
+        assert response.status_code == 400
+        assert executor.jobs == []
+
+
+class TestBulkImportStatus:
+    """Test the status endpoint for each final import state"""
+
+    def run_import(self, client, monkeypatch, content):
+        monkeypatch.setattr(app_module, 'import_executor', InlineExecutor())
+        import_id = upload(client, content).get_json()['import_id']
+        return client.get(f'/api/admin/import/status/{import_id}')
+
+    def test_completed(self, admin_client, monkeypatch):
+        """All rows imported"""
+        data = self.run_import(admin_client, monkeypatch, SUBJECTS_CSV).get_json()
+
+        assert data['success'] is True
+        assert data['status'] == 'completed'
+        assert (data['total'], data['successful'], data['failed']) == (2, 2, 0)
+
+    def test_partial(self, admin_client, monkeypatch):
+        """Some rows rejected"""
+        content = SUBJECTS_CSV + b"CS101,Duplicate Code,3\n"
+        data = self.run_import(admin_client, monkeypatch, content).get_json()
+
+        assert data['success'] is True
+        assert data['status'] == 'partial'
+        assert (data['total'], data['successful'], data['failed']) == (3, 2, 1)
+        assert 'already exists' in data['errors'][0]
+
+    def test_failed(self, admin_client, monkeypatch):
+        """The whole file rejected"""
+        content = b"subject_code,subject_name\nCS101,Programming in C\n"
+        data = self.run_import(admin_client, monkeypatch, content).get_json()
+
+        assert data['success'] is False
+        assert data['status'] == 'failed'
+        assert 'Missing required columns' in data['error']
+
+    def test_unknown_import_id(self, admin_client):
+        """Unknown ids return 404"""
+        response = admin_client.get('/api/admin/import/status/does-not-exist')
+        assert response.status_code == 404
+
+
+def make_import_log(status, stale=False):
+    """Add an ImportLog row, optionally last touched past IMPORT_STALE_AFTER"""
+    from models import User
+
+    import_log = ImportLog(import_type='subject', status=status,
+                           imported_by=User.query.first().user_id)
+    db.session.add(import_log)
+    db.session.commit()
+    if stale:
+        ImportLog.query.filter_by(import_id=import_log.import_id).update(
+            {'updated_at': datetime.utcnow() - app_module.IMPORT_STALE_AFTER - timedelta(minutes=1)},
+            synchronize_session=False
+        )
+        db.session.commit()
+    return import_log.import_id
+
+
+class TestStaleImports:
+    """Test failing imports whose worker has gone away"""
+
+    def get_status(self, client, import_id):
+        return client.get(f'/api/admin/import/status/{import_id}').get_json()
+
+    def test_stale_processing_import_is_failed(self, admin_client):
+        """An import that stopped making progress is reported as failed"""
+        data = self.get_status(admin_client, make_import_log('processing', stale=True))
+
+        assert data['success'] is False
+        assert data['status'] == 'failed'
+
+    def test_recent_processing_import_stays_processing(self, admin_client):
+        """An import still making progress is left alone"""
+        data = self.get_status(admin_client, make_import_log('processing'))
+
+        assert data['status'] == 'processing'
+
+    def test_queued_import_waiting_on_live_worker_stays_queued(self, admin_client):
+        """A queued import behind one that is making progress is left alone"""
+        make_import_log('processing')
+        data = self.get_status(admin_client, make_import_log('queued', stale=True))
+
+        assert data['status'] == 'queued'
+
+    def test_queued_import_with_no_live_worker_is_failed(self, admin_client):
+        """A queued import is failed once nothing is making progress"""
+        data = self.get_status(admin_client, make_import_log('queued', stale=True))
+
+        assert data['status'] == 'failed'
+
+    def test_progress_updates_heartbeat(self, admin_client):
+        """Writing progress moves updated_at, so a live import is not stale"""
+        import_id = make_import_log('processing', stale=True)
+
+        app_module.process_bulk_import([], 'subject', import_id)
+
+        import_log = db.session.get(ImportLog, import_id)
+        db.session.refresh(import_log)
+        assert import_log.status == 'completed'
+        assert import_log.updated_at > datetime.utcnow() - timedelta(minutes=1)
+
+    def test_failed_import_is_not_started(self, admin_client, tmp_path):
+        """The worker skips an import that was failed while queued"""
+        import_id = make_import_log('failed')
+        file_path = tmp_path / 'subjects.csv'
+        file_path.write_bytes(SUBJECTS_CSV)
+
+        app_module.run_bulk_import(import_id, str(file_path), '.csv', 'subject')
+
+        assert db.session.get(ImportLog, import_id).status == 'failed'
+        assert not file_path.exists()
+        assert db.session.execute(db.text('SELECT COUNT(*) FROM subjects')).scalar() == 0
+
+    def test_failed_import_is_not_overwritten(self, admin_client):
+        """An import failed mid-run stops and keeps its failed status"""
+        import pandas as pd
+
+        import_id = make_import_log('processing')
+
+        def chunks():
+            yield pd.read_csv(BytesIO(SUBJECTS_CSV))
+            ImportLog.query.filter_by(import_id=import_id).update(
+                {'status': 'failed'}, synchronize_session=False
+            )
+            db.session.commit()
+            yield pd.read_csv(BytesIO(b"subject_code,subject_name,semester\nCS201,Networks,3\n"))
+
+        result = app_module.process_bulk_import(chunks(), 'subject', import_id)
+
+        assert result['success'] is False
+        import_log = db.session.get(ImportLog, import_id)
+        db.session.refresh(import_log)
+        assert import_log.status == 'failed'
+        assert db.session.execute(db.text('SELECT COUNT(*) FROM subjects')).scalar() == 2
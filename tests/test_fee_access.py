@@ -0,0 +1,132 @@
+"""
+Test cases for fee breakdown authorization and its cache
+Run with: pytest tests/test_fee_access.py
+"""
+import pytest
+
+from app import fee_breakdown_access_error
+from cache_helpers import fee_access_cache, invalidate
+from models import db, Role, User, Program, Section, Faculty, Student
+
+
+@pytest.fixture(autouse=True)
+def clear_fee_access_cache():
+    """The cache is module level, so start and end every test empty"""
+    invalidate(fee_access_cache)
+    yield
+    invalidate(fee_access_cache)
+
+
+@pytest.fixture
+def school(app):
+    """Two sections with their own class teacher and one student each"""
+    roles = {name: Role(role_name=name) for name in ('admin', 'faculty', 'student')}
+    db.session.add_all(roles.values())
+    db.session.flush()
+
+    def make_user(username, role):
+        user = User(username=username, email=f'{username}@test.com',
+                    password_hash='hashed_password', role_id=roles[role].role_id)
+        db.session.add(user)
+        db.session.flush()
+        return user
+
+    program = Program(program_code='BCA', program_name='Bachelor of Computer Applications')
+    db.session.add(program)
+    db.session.flush()
+
+    data = {'admin': make_user('admin', 'admin'), 'program': program}
+    for key in ('a', 'b'):
+        teacher = Faculty(user_id=make_user(f'teacher_{key}', 'faculty').user_id,
+                          first_name='Teacher', last_name=key.upper())
+        db.session.add(teacher)
+        db.session.flush()
+        section = Section(section_name=f'Section {key.upper()}', program_id=program.program_id,
+                          class_teacher_id=teacher.faculty_id)
+        db.session.add(section)
+        db.session.flush()
+        student = Student(user_id=make_user(f'student_{key}', 'student').user_id,
+                          name=f'Student {key.upper()}', roll_number=f'BCA00{key}',
+                          program_id=program.program_id, section_id=section.section_id)
+        db.session.add(student)
+        db.session.flush()
+        data[f'teacher_{key}'] = teacher
+        data[f'section_{key}'] = section
+        data[f'student_{key}'] = student
+    db.session.commit()
+    return data
+
+
+def login(client, user):
+    """Put user in the test client's session"""
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+        sess['role'] = user.role.role_name
+        sess['is_authenticated'] = True
+
+
+class TestStudentAccess:
+    """Students may only read their own breakdown"""
+
+    def test_own_breakdown(self, school):
+        student = school['student_a']
+        assert fee_breakdown_access_error(student.user, student.student_id) is None
+
+    def test_other_students_breakdown(self, school):
+        error = fee_breakdown_access_error(school['student_a'].user, school['student_b'].student_id)
+        assert error == ('Unauthorized', 403)
+
+    def test_endpoint_rejects_other_students_breakdown(self, client, school):
+        login(client, school['student_a'].user)
+        response = client.get(f"/api/students/{school['student_b'].student_id}/fee-breakdown")
+        assert response.status_code == 403
+
+
+class TestClassTeacherAccess:
+    """Faculty may only read breakdowns for their own class"""
+
+    def test_own_section(self, school):
+        error = fee_breakdown_access_error(school['teacher_a'].user, school['student_a'].student_id)
+        assert error is None
+
+    def test_other_section(self, school):
+        error = fee_breakdown_access_error(school['teacher_a'].user, school['student_b'].student_id)
+        assert error == ('Unauthorized', 403)
+
+    def test_endpoint_rejects_other_section(self, client, school):
+        login(client, school['teacher_a'].user)
+        response = client.get(f"/api/students/{school['student_b'].student_id}/fee-breakdown")
+        assert response.status_code == 403
+
+
+class TestCacheInvalidation:
+    """Edits that change who teaches a student clear cached decisions"""
+
+    def test_cleared_after_section_update(self, client, school):
+        teacher = school['teacher_a']
+        student = school['student_b']
+        assert fee_breakdown_access_error(teacher.user, student.student_id) == ('Unauthorized', 403)
+
+        login(client, school['admin'])
+        response = client.put(f"/api/admin/sections/{school['section_b'].section_id}", json={
+            'section_name': 'Section B',
+            'program_id': school['program'].program_id,
+            'class_teacher_id': teacher.faculty_id
+        })
+        assert response.get_json()['success'] is True
+
+        assert fee_breakdown_access_error(teacher.user, student.student_id) is None
+
+    def test_cleared_after_student_section_update(self, client, school):
+        teacher = school['teacher_a']
+        student = school['student_b']
+        assert fee_breakdown_access_error(teacher.user, student.student_id) == ('Unauthorized', 403)
+
+        login(client, school['admin'])
+        response = client.post('/api/admin/students/update-sections', json={
+            'assignments': [{'student_id': student.student_id,
+                             'section_id': school['section_a'].section_id}]
+        })
+        assert response.get_json() == {'success': True, 'updated': 1}
+
+        assert fee_breakdown_access_error(teacher.user, student.student_id) is None
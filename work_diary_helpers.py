@@ -6,8 +6,9 @@ bills processing in bcaofficial.
 """
 
 import logging
-from datetime import datetime, timedelta, date
-from typing import Optional, List, Dict, Any, Tuple
+import math
+from datetime import datetime, timedelta, time
+from typing import Optional, List, Dict, Any, Tuple, Iterable
 
 logger = logging.getLogger(__name__)
 
@@ -33,12 +34,32 @@ def contains_lab(*texts: Any) -> bool:
     return False
 
 
-def build_months_structure_from_sessions(sessions: List) -> Tuple[Dict[str, List[Dict]], List[str]]:
+def schedule_duration_hours(start_time: Optional[time], end_time: Optional[time]) -> float:
+    """Return the length of a class in hours from its start and end times.
+
+    Works directly on the time fields, without building datetimes.
+
+    Args:
+        start_time: Class start time
+        end_time: Class end time
+
+    Returns:
+        Duration in hours, or 0.0 if either time is missing
     """
-    Build months structure from AttendanceSession records (no SL assignment here).
+    if not start_time or not end_time:
+        return 0.0
+    start_seconds = start_time.hour * 3600 + start_time.minute * 60 + start_time.second
+    end_seconds = end_time.hour * 3600 + end_time.minute * 60 + end_time.second
+    return (end_seconds - start_seconds) / 3600
+
+
+def build_months_structure_from_rows(rows: Iterable) -> Tuple[Dict[str, List[Dict]], List[str]]:
+    """
+    Build months structure from work diary view rows (no SL assignment here).
 
     Args:
-        sessions: List of AttendanceSession objects with related schedule, subject, section, faculty
+        rows: Iterable of v_work_diary_rows rows (models.work_diary_rows), one per session.
+            Consumed in a single pass, so a streaming query (yield_per) can be passed directly.
         
     Returns:
         Tuple of (months_dict, faculty_list)
@@ -60,18 +81,15 @@ def build_months_structure_from_sessions(sessions: List) -> Tuple[Dict[str, List
       "Diary No.", "Date_iso", "Date" (dd-mm-yyyy), COMBINED_HEADER, 
       "Actual hours", "Claiming hours", "Subject code", "Faculty"
     """
-    if not sessions:
-        return {}, []
-    
     months = {}
     faculty_set = set()
 
-    for session in sessions:
+    for row in rows:
         # Get the date from session
-        if not session.taken_at:
+        if not row.taken_at:
             continue
             
-        d = session.taken_at.date()
+        d = row.taken_at.date()
         month_label = d.strftime("%B %Y")
 
         # Calculate week boundaries (Monday to Saturday)
@@ -94,34 +112,25 @@ def build_months_structure_from_sessions(sessions: List) -> Tuple[Dict[str, List
             }
             weeks.append(week_obj)
 
-        # Extract data from session and related objects
-        schedule = session.schedule
-        subject = schedule.subject if schedule else None
-        section = schedule.section if schedule else None
-        faculty = schedule.faculty if schedule else None
-
         # Calculate hours
         actual_hours = 0.0
-        if schedule and schedule.start_time and schedule.end_time:
-            dummy_date = date.today()
-            start_dt = datetime.combine(dummy_date, schedule.start_time)
-            end_dt = datetime.combine(dummy_date, schedule.end_time)
-            actual_hours = (end_dt - start_dt).total_seconds() / 3600
+        if row.start_time and row.end_time:
+            actual_hours = schedule_duration_hours(row.start_time, row.end_time)
             actual_hours = min(actual_hours, 12)  # Cap at 12 hours max
 
         # Detect lab/practical
         is_lab = False
-        if subject:
-            is_lab = contains_lab(subject.subject_type, subject.subject_name)
+        if row.subject_code is not None:
+            is_lab = contains_lab(row.subject_type, row.subject_name)
 
         # Claiming hours: Lab period reduced by 3/4 (multiply by 0.75)
         claiming_hours = round(actual_hours * 0.75, 2) if is_lab else round(actual_hours, 2)
 
         # Build particulars/combined field
-        particulars = session.topic_taught or "Regular Class"
-        sem_info = f"({section.current_semester} Sem)" if section and section.current_semester else ""
-        subject_name = subject.subject_name if subject else "Unknown Subject"
-        section_name = section.section_name if section else ""
+        particulars = row.topic_taught or "Regular Class"
+        sem_info = f"({row.current_semester} Sem)" if row.current_semester else ""
+        subject_name = row.subject_name if row.subject_code is not None else "Unknown Subject"
+        section_name = row.section_name or ""
         
         # Combined: Class/Section - Subject - Topic (Semester)
         combined_parts = []
@@ -137,15 +146,15 @@ def build_months_structure_from_sessions(sessions: List) -> Tuple[Dict[str, List
 
         # Faculty name
         faculty_name = ""
-        if faculty:
-            faculty_name = f"{faculty.first_name} {faculty.last_name}"
+        if row.faculty_first_name is not None:
+            faculty_name = f"{row.faculty_first_name} {row.faculty_last_name}"
             faculty_set.add(faculty_name)
 
         # Diary number
-        diary_no = session.diary_number or f"DN-{session.attendance_session_id[:8].upper()}"
+        diary_no = row.diary_number or f"DN-{row.attendance_session_id[:8].upper()}"
 
         # Subject code
-        subject_code = subject.subject_code if subject else "N/A"
+        subject_code = row.subject_code if row.subject_code is not None else "N/A"
 
         # Store entry (no SL No assigned yet)
         entry = {
@@ -159,20 +168,19 @@ def build_months_structure_from_sessions(sessions: List) -> Tuple[Dict[str, List
             "Subject code": subject_code,
             "Faculty": faculty_name,
             "_is_lab": is_lab,
-            "_session_id": session.attendance_session_id
+            "_session_id": row.attendance_session_id
         }
 
         week_obj["entries"].append(entry)
-        week_obj["week_total_actual"] += entry["Actual hours"]
-        week_obj["week_total_claiming"] += entry["Claiming hours"]
 
     # Finalize months: sort weeks and entries, round totals
     for mlabel, weeks in months.items():
         weeks.sort(key=lambda w: w["week_start"])
         for w in weeks:
             w["entries"].sort(key=lambda e: (e["Date_iso"], str(e.get("Dairy No.", ""))))
-            w["week_total_actual"] = round(w["week_total_actual"], 2)
-            w["week_total_claiming"] = round(w["week_total_claiming"], 2)
+            # fsum: exact float sums, so totals don't drift with entry count
+            w["week_total_actual"] = round(math.fsum(e["Actual hours"] for e in w["entries"]), 2)
+            w["week_total_claiming"] = round(math.fsum(e["Claiming hours"] for e in w["entries"]), 2)
 
     faculty_list = sorted(faculty_set)
     return months, faculty_list
@@ -184,7 +192,7 @@ def filter_and_assign_sl(months: Dict[str, List[Dict]], selected_month: str,
     Filter weeks by month and faculty, then assign sequential SL numbers.
     
     Args:
-        months: Months structure from build_months_structure_from_sessions
+        months: Months structure from build_months_structure_from_rows
         selected_month: Month to filter (e.g., "January 2026")
         selected_faculty: Faculty name to filter (or "All" for all faculty)
         
@@ -206,8 +214,10 @@ def filter_and_assign_sl(months: Dict[str, List[Dict]], selected_month: str,
 
     rendered_weeks = []
     for w in months[selected_month]:
-        # Filter entries inside this month
+        # Filter entries inside this month, collecting hours for the week totals
         entries_in_month = []
+        actual_hours = []
+        claiming_hours = []
         for e in w["entries"]:
             e_date = datetime.strptime(e["Date_iso"], "%Y-%m-%d").date()
             if not (first_day <= e_date <= last_day):
@@ -217,6 +227,8 @@ def filter_and_assign_sl(months: Dict[str, List[Dict]], selected_month: str,
                 if e.get("Faculty", "") != selected_faculty:
                     continue
             entries_in_month.append(e)
+            actual_hours.append(e["Actual hours"])
+            claiming_hours.append(e["Claiming hours"])
 
         if not entries_in_month:
             continue
@@ -230,8 +242,8 @@ def filter_and_assign_sl(months: Dict[str, List[Dict]], selected_month: str,
             "display_start": display_start,
             "display_end": display_end,
             "entries": entries_in_month,
-            "week_total_actual": round(sum(e["Actual hours"] for e in entries_in_month), 2),
-            "week_total_claiming": round(sum(e["Claiming hours"] for e in entries_in_month), 2)
+            "week_total_actual": round(math.fsum(actual_hours), 2),
+            "week_total_claiming": round(math.fsum(claiming_hours), 2)
         })
 
     # Sort weeks and assign week numbers